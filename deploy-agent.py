@@ -8,6 +8,8 @@ import argparse
 import sys
 import subprocess
 import platform
+import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from version import VersionManager
 
@@ -29,74 +31,84 @@ def check_dotnet():
         return False
 
 
-def build_agent_windows():
-    """Build Agent for Windows"""
-    print("📦 Building Windows x64 Agent...")
-    agent_dir = Path("agent/Program")
-    
+# NuGet package folder kept between builds (CI caches it), unless NUGET_PACKAGES is already set
+NUGET_CACHE_DIR = Path(os.environ.get("NUGET_PACKAGES", ".nuget-cache")).resolve()
+
+# Skip the telemetry upload and first-run setup on every dotnet invocation
+DOTNET_ENV = {
+    **os.environ,
+    "DOTNET_CLI_TELEMETRY_OPTOUT": "1",
+    "DOTNET_SKIP_FIRST_TIME_EXPERIENCE": "1",
+    "NUGET_PACKAGES": str(NUGET_CACHE_DIR),
+}
+
+
+def restore_agent():
+    """
+    Restore Agent packages once for every runtime
+    Agent.csproj lists all runtimes in RuntimeIdentifiers, so a single restore
+    covers each publish below and they can all run with --no-restore
+    """
+    print("📦 Restoring Agent packages...")
+    NUGET_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    subprocess.run(
+        ["dotnet", "restore"],
+        cwd=Path("agent/Program"),
+        env=DOTNET_ENV,
+        check=True
+    )
+    print("✓ Agent packages restored")
+
+
+def publish_agent(runtime: str, output_dir: str):
+    """Publish a self-contained single-file Agent for one runtime (packages must already be restored)"""
     subprocess.run(
         [
             "dotnet", "publish",
             "-c", "Release",
-            "-r", "win-x64",
+            "-r", runtime,
             "-p:PublishSingleFile=true",
             "-p:IncludeNativeLibrariesForSelfExtract=true",
             "--self-contained", "true",
-            "-o", "../../dist/agent-windows"
+            "--no-restore",
+            "--no-dependencies",
+            "-o", output_dir
         ],
-        cwd=agent_dir,
+        cwd=Path("agent/Program"),
+        env=DOTNET_ENV,
         check=True
     )
+
+
+def build_agent_windows():
+    """Build Agent for Windows"""
+    print("📦 Building Windows x64 Agent...")
+    publish_agent("win-x64", "../../dist/agent-windows")
     print("✓ Windows Agent build completed: dist/agent-windows/Agent.exe")
 
 
 def build_agent_macos_x64():
     """Build Agent for macOS x64"""
     print("📦 Building macOS x64 Agent...")
-    agent_dir = Path("agent/Program")
-    
-    subprocess.run(
-        [
-            "dotnet", "publish",
-            "-c", "Release",
-            "-r", "osx-x64",
-            "-p:PublishSingleFile=true",
-            "-p:IncludeNativeLibrariesForSelfExtract=true",
-            "--self-contained", "true",
-            "-o", "../../dist/agent-macos-x64"
-        ],
-        cwd=agent_dir,
-        check=True
-    )
+    publish_agent("osx-x64", "../../dist/agent-macos-x64")
     print("✓ macOS x64 Agent build completed: dist/agent-macos-x64/Agent")
 
 
 def build_agent_macos_arm64():
     """Build Agent for macOS ARM64 (Apple Silicon)"""
     print("📦 Building macOS ARM64 Agent...")
-    agent_dir = Path("agent/Program")
-    
-    subprocess.run(
-        [
-            "dotnet", "publish",
-            "-c", "Release",
-            "-r", "osx-arm64",
-            "-p:PublishSingleFile=true",
-            "-p:IncludeNativeLibrariesForSelfExtract=true",
-            "--self-contained", "true",
-            "-o", "../../dist/agent-macos-arm64"
-        ],
-        cwd=agent_dir,
-        check=True
-    )
+    publish_agent("osx-arm64", "../../dist/agent-macos-arm64")
     print("✓ macOS ARM64 Agent build completed: dist/agent-macos-arm64/Agent")
 
 
 def build_all_platforms():
-    """Build Agent for all platforms"""
-    build_agent_windows()
-    build_agent_macos_x64()
-    build_agent_macos_arm64()
+    """Build Agent for all platforms (publishes run in parallel, each RID has its own obj/ directory)"""
+    builds = [build_agent_windows, build_agent_macos_x64, build_agent_macos_arm64]
+    with ThreadPoolExecutor(max_workers=len(builds)) as executor:
+        futures = [executor.submit(build) for build in builds]
+        # Re-raise a failed publish (CalledProcessError) once every publish has ended
+        for future in futures:
+            future.result()
 
 
 def main():
@@ -129,6 +141,9 @@ def main():
         # Create dist directory
         Path("dist").mkdir(exist_ok=True)
 
+        # Restore once, shared by every publish
+        restore_agent()
+
         # Build for platform
         if args.platform == "windows":
             build_agent_windows()
@@ -8,15 +8,63 @@ import argparse
 import sys
 import subprocess
 import os
+import hashlib
 from pathlib import Path
 from version import VersionManager
 
 
+# Hash of the build inputs from the last successful build
+BUILD_STAMP = Path("dist/.build-stamp")
+
+# Build inputs, and the directories (build outputs, dependencies, package caches)
+# left out of the hash even if something in them is tracked
+SOURCE_PATTERNS = ("*.py", "*.cs", "*.csproj", "*.props", "*.targets")
+EXCLUDED_DIRS = {
+    "bin", "obj", "dist", "node_modules", "__pycache__", ".git", "venv", ".venv",
+    ".nuget-cache",
+}
+
+
+def _source_files(root: Path) -> list:
+    """Tracked and untracked-but-not-ignored build inputs under root, from git"""
+    # git already knows the file list, so nothing is walked (package caches,
+    # virtualenvs and other ignored trees are never touched)
+    result = subprocess.run(
+        ["git", "ls-files", "-z", "--cached", "--others", "--exclude-standard",
+         "--", *SOURCE_PATTERNS],
+        cwd=root, capture_output=True, check=True
+    )
+    paths = {
+        root / name
+        for name in result.stdout.decode().split("\0")
+        if name and not EXCLUDED_DIRS.intersection(Path(name).parts)
+    }
+    # Tracked files deleted from the working tree are still listed by --cached
+    return sorted(path for path in paths if path.is_file())
+
+
+def _source_hash(root: Path) -> str:
+    """SHA-256 over the path and content of every build input under root"""
+    digest = hashlib.sha256()
+    for path in _source_files(root):
+        digest.update(path.relative_to(root).as_posix().encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
 def build_project():
-    """Build project"""
+    """Build project (skipped when the sources match the last successful build)"""
+    source_hash = _source_hash(Path("."))
+    if BUILD_STAMP.exists() and BUILD_STAMP.read_text().strip() == source_hash:
+        print("✓ Build up to date, skipping")
+        return
+    
     print("📦 Building project...")
     # TODO: Add actual build commands
     # Example: subprocess.run(["python", "-m", "build"], check=True)
+    
+    BUILD_STAMP.parent.mkdir(exist_ok=True)
+    BUILD_STAMP.write_text(source_hash)
     print("✓ Build completed")
 
 
@@ -3,7 +3,6 @@ Configuration settings for Master backend
 """
 
 import os
-from pathlib import Path
 from typing import List
 
 # Application settings
@@ -17,11 +16,11 @@ CORS_ALLOW_METHODS = ["*"]
 CORS_ALLOW_HEADERS = ["*"]
 
 # Static files paths (frontend build)
-FRONTEND_DIST_PATHS = [
-    Path(__file__).parent.parent / "frontend" / "dist",
-    Path("/app/frontend/dist"),  # Docker path
-    Path("frontend/dist"),  # Alternative path
-]
+FRONTEND_DIST_PATHS = (
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "frontend", "dist"),
+    "/app/frontend/dist",  # Docker path
+    "frontend/dist",  # Alternative path
+)
 
 # Database settings (from environment or defaults)
 DATABASE_URL = os.getenv(
@@ -34,3 +33,13 @@ HOST = os.getenv("HOST", "0.0.0.0")
 PORT = int(os.getenv("PORT", "8000"))
 RELOAD = os.getenv("RELOAD", "true").lower() == "true"  # Development mode
 
+# Event loop / HTTP parser implementations for uvicorn
+# uvloop (libuv) batches socket writes with writev; it is not available on Windows
+UVICORN_LOOP = os.getenv("UVICORN_LOOP", "asyncio" if os.name == "nt" else "uvloop")
+UVICORN_HTTP = os.getenv("UVICORN_HTTP", "httptools")
+
+# Monitoring summary cache (/api/metrics endpoints)
+METRICS_CACHE_ENABLED = os.getenv("METRICS_CACHE_ENABLED", "true").lower() == "true"
+METRICS_CACHE_TTL_SECONDS = float(os.getenv("METRICS_CACHE_TTL_SECONDS", "5"))
+# Samples recorded before a cached summary is dropped ahead of its TTL
+METRICS_CACHE_DIRTY_THRESHOLD = int(os.getenv("METRICS_CACHE_DIRTY_THRESHOLD", "10000"))
@@ -0,0 +1,52 @@
+"""
+Shared pytest fixtures for the backend tests
+"""
+
+import asyncio
+
+import pytest
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from main import app
+from database import Base, get_db
+
+
+@pytest.fixture(scope="session")
+def event_loop():
+    """One event loop for the session, so the shared connection outlives each test"""
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+@pytest_asyncio.fixture(scope="function")
+async def app_engine():
+    """
+    Fresh in-memory database for tests of code that commits on its own sessions
+    (background flushers, startup loaders); no SAVEPOINT rollback, dropped after the test
+    """
+    engine = create_async_engine(
+        "sqlite+aiosqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield engine
+    await engine.dispose()
+
+
+@pytest_asyncio.fixture(scope="function")
+async def app_session_factory(app_engine):
+    """Session factory for app_engine, also serving the routes' get_db dependency"""
+    session_factory = async_sessionmaker(app_engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def override_get_db():
+        async with session_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = override_get_db
+    yield session_factory
+    app.dependency_overrides.pop(get_db, None)
@@ -3,6 +3,10 @@ Database configuration and setup
 Uses SQLite3 for development, PostgreSQL for production
 """
 import os
+import orjson
+from sqlalchemy import event
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
 from typing import AsyncGenerator
@@ -19,14 +23,41 @@ DATABASE_URL = os.getenv(
 # Determine if using SQLite or PostgreSQL
 IS_SQLITE = DATABASE_URL.startswith("sqlite+aiosqlite")
 
+# INSERT construct with ON CONFLICT support (upserts) for the configured backend
+dialect_insert = sqlite.insert if IS_SQLITE else postgresql.insert
+
+
+# JSON columns (assets, release IDs/tags, cached versions) are encoded and decoded
+# with orjson instead of stdlib json; each value is decoded once, when the row loads
+def _json_dumps(value) -> str:
+    """JSON column serializer (the drivers expect text)"""
+    return orjson.dumps(value).decode()
+
+
 # Create async engine with appropriate settings
-# SQLite does not support connection pooling, so we only use pool settings for PostgreSQL
-if IS_SQLITE:
-    # SQLite: No connection pooling, simpler settings
+if IS_SQLITE and ":memory:" in DATABASE_URL:
+    # In-memory SQLite: each connection is a separate database, keep the default pool
+    engine = create_async_engine(
+        DATABASE_URL,
+        echo=False,  # Set to False, we'll use custom query logging
+        future=True,
+        query_cache_size=1200,  # Compiled SQL cache entries (default 500)
+        json_serializer=_json_dumps,
+        json_deserializer=orjson.loads,
+    )
+elif IS_SQLITE:
+    # SQLite file: pool connections (aiosqlite defaults to NullPool, which opens a
+    # connection, its worker thread and the PRAGMAs below on every request)
     engine = create_async_engine(
         DATABASE_URL,
         echo=False,  # Set to False, we'll use custom query logging
         future=True,
+        query_cache_size=1200,  # Compiled SQL cache entries (default 500)
+        json_serializer=_json_dumps,
+        json_deserializer=orjson.loads,
+        poolclass=AsyncAdaptedQueuePool,
+        pool_size=5,  # WAL allows one writer; a few connections cover concurrent readers
+        max_overflow=10,
     )
 else:
     # PostgreSQL: Use connection pooling
@@ -34,11 +65,38 @@ else:
         DATABASE_URL,
         echo=False,  # Set to False, we'll use custom query logging
         future=True,
-        pool_size=10,  # Connection pool size
-        max_overflow=20,  # Maximum overflow connections
+        query_cache_size=1200,  # Compiled SQL cache entries (default 500)
+        json_serializer=_json_dumps,
+        json_deserializer=orjson.loads,
+        pool_size=20,  # Connection pool size
+        max_overflow=0,  # Fixed pool: no connections opened and dropped under bursts
         pool_pre_ping=True,  # Verify connections before using
+        pool_recycle=1800,  # Replace connections older than 30 minutes (server/proxy idle timeouts)
+        insertmanyvalues_page_size=1000,  # Rows per multi-row INSERT for bulk inserts
     )
 
+# SQLite tuning applied to every new connection
+# - WAL + synchronous=NORMAL: commits no longer fsync the main database file
+# - temp_store=MEMORY: temporary tables/indices for sorts stay in RAM
+# - mmap_size (256 MiB): hot pages are read through mmap instead of read() calls
+# - cache_size (negative = KiB, 64 MiB): larger page cache per connection
+SQLITE_PRAGMAS = (
+    "journal_mode=WAL",
+    "synchronous=NORMAL",
+    "temp_store=MEMORY",
+    "mmap_size=268435456",
+    "cache_size=-65536",
+)
+
+if IS_SQLITE:
+    @event.listens_for(engine.sync_engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        """Apply SQLITE_PRAGMAS when the pool opens a connection"""
+        cursor = dbapi_connection.cursor()
+        for pragma in SQLITE_PRAGMAS:
+            cursor.execute(f"PRAGMA {pragma}")
+        cursor.close()
+
 # Create session factory
 AsyncSessionLocal = async_sessionmaker(
     engine,
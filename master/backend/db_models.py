@@ -1,7 +1,8 @@
 """
 SQLAlchemy database models
 """
-from sqlalchemy import Column, String, DateTime, Text, JSON, Enum as SQLEnum, Index, ForeignKey
+from sqlalchemy import Column, String, DateTime, Text, JSON, SmallInteger, Index, ForeignKey
+from sqlalchemy.types import TypeDecorator
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from datetime import datetime
@@ -12,29 +13,54 @@ from database import Base
 
 
 class AgentStatusEnum(str, enum.Enum):
-    """Agent status enumeration"""
+    """Agent status enumeration (stored as its position, append new members at the end)"""
     ONLINE = "online"
     OFFLINE = "offline"
     ERROR = "error"
 
 
 class DeploymentStatusEnum(str, enum.Enum):
-    """Deployment status enumeration"""
+    """Deployment status enumeration (stored as its position, append new members at the end)"""
     PENDING = "pending"
     IN_PROGRESS = "in_progress"
     SUCCESS = "success"
     FAILED = "failed"
 
 
+class SmallIntEnum(TypeDecorator):
+    """
+    Stores an enum member as a SMALLINT code (its position in the enum)
+    Narrower rows and index keys than the member name, and no named ENUM type on PostgreSQL
+    """
+    impl = SmallInteger
+    cache_ok = True
+
+    def __init__(self, enum_class):
+        super().__init__()
+        self.enum_class = enum_class
+        self._members = list(enum_class)
+        self._codes = {member: code for code, member in enumerate(self._members)}
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return self._codes[self.enum_class(value)]
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return self._members[value]
+
+
 class AgentDB(Base):
     """Agent database model"""
     __tablename__ = "agents"
 
-    id = Column(String, primary_key=True, index=True)
+    id = Column(String, primary_key=True)
     name = Column(String, nullable=False, index=True)
     platform = Column(String, nullable=False)  # "windows" or "macos"
     version = Column(String, nullable=False)
-    status = Column(SQLEnum(AgentStatusEnum), nullable=False, default=AgentStatusEnum.OFFLINE)
+    status = Column(SmallIntEnum(AgentStatusEnum), nullable=False, default=AgentStatusEnum.OFFLINE)
     last_seen = Column(DateTime, nullable=False, default=func.now(), onupdate=func.now())
     ip_address = Column(String, nullable=True)
 
@@ -46,7 +72,7 @@ class ReleaseDB(Base):
     """Release database model"""
     __tablename__ = "releases"
 
-    id = Column(String, primary_key=True, index=True)
+    id = Column(String, primary_key=True)
     tag_name = Column(String, nullable=False)
     name = Column(String, nullable=False)
     version = Column(String, nullable=True)  # Will be populated when fetching versions
@@ -54,6 +80,9 @@ class ReleaseDB(Base):
     download_url = Column(Text, nullable=True)
     description = Column(Text, nullable=True)
     assets = Column(JSON, nullable=True, default=list)  # List of artifact file names
+    # Last GitHub releases response for this repository: its ETag and parsed versions
+    versions_etag = Column(Text, nullable=True)
+    cached_versions = Column(JSON, nullable=True)
 
     def __repr__(self):
         return f"<ReleaseDB(id={self.id}, name={self.name}, tag_name={self.tag_name})>"
@@ -63,11 +92,11 @@ class DeploymentDB(Base):
     """Deployment database model"""
     __tablename__ = "deployments"
 
-    id = Column(String, primary_key=True, index=True)
-    agent_id = Column(String, ForeignKey('agents.id', ondelete='CASCADE'), nullable=False, index=True)
+    id = Column(String, primary_key=True)
+    agent_id = Column(String, ForeignKey('agents.id', ondelete='CASCADE'), nullable=False)
     release_ids = Column(JSON, nullable=False)  # List of release IDs
     release_tags = Column(JSON, nullable=False)  # List of release tag names
-    status = Column(SQLEnum(DeploymentStatusEnum), nullable=False, default=DeploymentStatusEnum.PENDING)
+    status = Column(SmallIntEnum(DeploymentStatusEnum), nullable=False, default=DeploymentStatusEnum.PENDING)
     created_at = Column(DateTime, nullable=False, default=func.now())
     started_at = Column(DateTime, nullable=True)
     completed_at = Column(DateTime, nullable=True)
@@ -78,10 +107,15 @@ class DeploymentDB(Base):
     
     # Indexes for efficient querying
     # Composite index for common query: WHERE agent_id = ? AND status = ? ORDER BY created_at
+    # (agent_id, created_at) serves one agent's history newest first without a sort, and
+    # replaces a standalone agent_id index (both composites also cover agent_id lookups)
+    # No standalone created_at index on SQLite: it cost a B-tree update on every insert
+    # PostgreSQL keeps one covering (created_at, id) for the global history ordering
     __table_args__ = (
         Index('idx_deployment_agent_status_created', 'agent_id', 'status', 'created_at'),
+        Index('idx_deployment_agent_created', 'agent_id', 'created_at'),
         Index('idx_deployment_status', 'status'),  # For filtering by status
-        Index('idx_deployment_created_at', 'created_at'),  # For ordering by created_at
+        Index('idx_deployment_created_desc', 'created_at', 'id', postgresql_using='btree').ddl_if(dialect='postgresql'),
     )
 
     def __repr__(self):
@@ -92,7 +126,7 @@ class SettingsDB(Base):
     """Settings database model (for GitHub token storage)"""
     __tablename__ = "settings"
 
-    key = Column(String, primary_key=True, index=True)
+    key = Column(String, primary_key=True)
     value = Column(Text, nullable=False)
     updated_at = Column(DateTime, nullable=False, default=func.now(), onupdate=func.now())
 
@@ -0,0 +1,47 @@
+"""
+Shared HTTP client for GitHub API calls
+One AsyncClient for the whole process, so release-version lookups reuse pooled
+keep-alive connections instead of a new TCP/TLS handshake per request
+"""
+
+import importlib.util
+from typing import Optional
+
+import httpx
+
+GITHUB_API_URL = "https://api.github.com"
+REQUEST_TIMEOUT_SECONDS = 10.0
+# Idle connections are kept this long (httpx default: 5 s, shorter than typical UI gaps)
+KEEPALIVE_EXPIRY_SECONDS = 60.0
+
+# HTTP/2 (one multiplexed connection to api.github.com) needs the optional h2 package
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+def start():
+    """Create the shared client (call on application startup)"""
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(
+            base_url=GITHUB_API_URL,
+            timeout=REQUEST_TIMEOUT_SECONDS,
+            http2=HTTP2_AVAILABLE,
+            limits=httpx.Limits(max_keepalive_connections=20, keepalive_expiry=KEEPALIVE_EXPIRY_SECONDS),
+        )
+
+
+async def stop():
+    """Close the shared client and its connections (call on application shutdown)"""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def client() -> httpx.AsyncClient:
+    """The shared client, created on first use if startup has not run (scripts, tests)"""
+    if _client is None:
+        start()
+    return _client
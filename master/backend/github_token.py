@@ -0,0 +1,56 @@
+"""
+In-process copy of the GitHub token stored in the settings table
+Read on every release-versions request; loaded from the database once and
+updated by the settings routes when the token is saved or removed
+"""
+
+import asyncio
+from typing import Dict, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db_models import SettingsDB
+
+# Settings key the token is stored under
+SETTINGS_KEY = "github_token"
+
+_token: Optional[str] = None
+# Settings-page answer for the current token (masked preview), built when the token changes
+_status: Dict[str, object] = {"has_token": False}
+_loaded = False
+# Serializes the first load, so concurrent cold requests run one SELECT
+_load_lock = asyncio.Lock()
+
+
+async def _ensure_loaded(db: AsyncSession):
+    if _loaded:
+        return
+
+    async with _load_lock:
+        if not _loaded:
+            store(await db.scalar(select(SettingsDB.value).where(SettingsDB.key == SETTINGS_KEY)))
+
+
+async def get(db: AsyncSession) -> Optional[str]:
+    """Current GitHub token (None if not set), querying the database only on first use"""
+    await _ensure_loaded(db)
+    return _token
+
+
+async def status(db: AsyncSession) -> Dict[str, object]:
+    """Whether a token is set, with a masked preview (only the last 4 characters shown)"""
+    await _ensure_loaded(db)
+    return _status
+
+
+def store(value: Optional[str]):
+    """Record the stored token (after save or delete is committed)"""
+    global _token, _status, _loaded
+    _token = value or None
+    if _token:
+        masked_token = "***" + _token[-4:] if len(_token) > 4 else "***"
+        _status = {"has_token": True, "token_preview": masked_token}
+    else:
+        _status = {"has_token": False}
+    _loaded = True
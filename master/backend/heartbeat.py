@@ -0,0 +1,177 @@
+"""
+Agent heartbeat write-behind queue
+Heartbeats from already registered agents are kept in memory and only written
+to the database when something changed or the stored last_seen is getting old;
+writes are queued and applied in batches by a background task
+"""
+
+import asyncio
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import msgspec
+from sqlalchemy import bindparam, update
+
+from database import AsyncSessionLocal
+from db_models import AgentDB, AgentStatusEnum
+from logging_config import app_logger
+from models import AgentRegister
+
+# How long the flusher waits after the first queued heartbeat to collect a batch
+FLUSH_INTERVAL_SECONDS = 0.05
+
+# Unchanged heartbeats reach the database at most this often per agent; kept below the
+# 30 s offline timeout so readers of the stored last_seen never see a live agent as offline
+WRITE_INTERVAL_SECONDS = 20
+
+# Agent name -> agent ID for agents known to exist in the database
+_agent_ids_by_name: Dict[str, str] = {}
+
+# Core UPDATE executed once per batch (executemany); unlike the ORM bulk update
+# it tolerates agents that were deleted while their heartbeat was queued
+_agents_table = AgentDB.__table__
+_update_heartbeat = (
+    update(_agents_table)
+    .where(_agents_table.c.id == bindparam("agent_id"))
+    .values(
+        platform=bindparam("hb_platform"),
+        version=bindparam("hb_version"),
+        ip_address=bindparam("hb_ip_address"),
+        status=bindparam("hb_status"),
+        last_seen=bindparam("hb_last_seen"),
+    )
+)
+
+# Agent ID -> (received_at, heartbeat data) of the latest heartbeat received
+_latest: Dict[str, Tuple[datetime, dict]] = {}
+
+# Agent ID -> (last_seen, (platform, version, ip_address)) as last written to the database
+_written: Dict[str, Tuple[datetime, tuple]] = {}
+
+# Queued by stop() to make the flusher write what is left and exit
+_STOP = None
+
+_queue: Optional["asyncio.Queue[Optional[Tuple[str, dict, datetime]]]"] = None
+_flusher_task: Optional[asyncio.Task] = None
+
+
+def is_running() -> bool:
+    """Check if the background flusher is accepting heartbeats"""
+    return _flusher_task is not None and not _flusher_task.done()
+
+
+def _fields(data: dict) -> tuple:
+    """Agent fields a heartbeat can change besides last_seen"""
+    return (data["platform"], data["version"], data["ip_address"])
+
+
+def remember_agent(name: str, agent_id: str, agent_data: AgentRegister, written_at: datetime):
+    """Record that an agent with this name exists in the database, as just written from agent_data"""
+    _agent_ids_by_name[name] = agent_id
+    _written[agent_id] = (written_at, (agent_data.platform, agent_data.version, agent_data.ip_address))
+
+
+def forget_agent(agent_id: str):
+    """Drop an agent from the known agents (after rename or delete)"""
+    for name in [name for name, known_id in _agent_ids_by_name.items() if known_id == agent_id]:
+        del _agent_ids_by_name[name]
+    _latest.pop(agent_id, None)
+    _written.pop(agent_id, None)
+
+
+def last_seen(agent_id: str) -> Optional[datetime]:
+    """Time of the latest heartbeat received from an agent, which may not be written yet"""
+    latest = _latest.get(agent_id)
+    return latest[0] if latest else None
+
+
+def lookup_agent_id(name: str) -> Optional[str]:
+    """Get the ID of a known agent, or None if the heartbeat must be handled synchronously"""
+    if not is_running():
+        return None
+    return _agent_ids_by_name.get(name)
+
+
+def submit(agent_id: str, agent_data: AgentRegister, received_at: datetime):
+    """Record a heartbeat for a known agent, queueing a write only when the database needs one"""
+    data = msgspec.structs.asdict(agent_data)
+    _latest[agent_id] = (received_at, data)
+    
+    written = _written.get(agent_id)
+    if (
+        written is None
+        or written[1] != _fields(data)
+        or (received_at - written[0]).total_seconds() >= WRITE_INTERVAL_SECONDS
+    ):
+        # Counted as written right away so heartbeats arriving before the flush don't queue again
+        _written[agent_id] = (received_at, _fields(data))
+        _queue.put_nowait((agent_id, data, received_at))
+
+
+async def _apply(batch: List[Tuple[str, dict, datetime]]):
+    """Write a batch of heartbeats, keeping only the latest one per agent"""
+    latest: Dict[str, dict] = {}
+    for agent_id, data, received_at in batch:
+        latest[agent_id] = {
+            "agent_id": agent_id,
+            "hb_platform": data["platform"],
+            "hb_version": data["version"],
+            "hb_ip_address": data["ip_address"],
+            "hb_status": AgentStatusEnum.ONLINE,
+            "hb_last_seen": received_at,
+        }
+
+    async with AsyncSessionLocal() as session:
+        await session.execute(_update_heartbeat, list(latest.values()))
+        await session.commit()
+
+
+def _drain() -> List[Tuple[str, dict, datetime]]:
+    """Collect every heartbeat currently queued"""
+    batch = []
+    while not _queue.empty():
+        batch.append(_queue.get_nowait())
+    return batch
+
+
+async def _flush_loop():
+    """Background task: wait for a heartbeat, collect a batch, apply it"""
+    while True:
+        batch = [await _queue.get()]
+        await asyncio.sleep(FLUSH_INTERVAL_SECONDS)
+        batch.extend(_drain())
+        
+        stopping = _STOP in batch
+        heartbeats = [item for item in batch if item is not _STOP]
+        if heartbeats:
+            try:
+                await _apply(heartbeats)
+            except Exception:
+                app_logger.error(f"Failed to flush {len(heartbeats)} agent heartbeats", exc_info=True)
+        if stopping:
+            return
+
+
+def start():
+    """Start the background flusher (call on application startup)"""
+    global _queue, _flusher_task
+    _queue = asyncio.Queue()
+    _flusher_task = asyncio.create_task(_flush_loop())
+
+
+async def stop():
+    """Stop the background flusher after it has written every queued heartbeat"""
+    global _flusher_task
+    if _flusher_task is None:
+        return
+    
+    # New heartbeats take the synchronous path from here on
+    flusher_task, _flusher_task = _flusher_task, None
+    
+    # Write the latest last_seen of every agent whose heartbeats were skipped
+    for agent_id, (received_at, data) in _latest.items():
+        written = _written.get(agent_id)
+        if written is None or written[0] < received_at:
+            _queue.put_nowait((agent_id, data, received_at))
+    _queue.put_nowait(_STOP)
+    await flusher_task
@@ -0,0 +1,45 @@
+"""
+In-process mirror of the agent IDs stored in the database
+Lets hot paths (deployment creation, agent polling) validate an agent ID
+without a SELECT; a miss is not authoritative and falls back to the database
+"""
+
+from typing import Set
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import AsyncSessionLocal
+from db_models import AgentDB
+
+# Agent IDs known to exist in the database
+_agent_ids: Set[str] = set()
+
+
+def add(agent_id: str):
+    """Record that an agent exists (after register)"""
+    _agent_ids.add(agent_id)
+
+
+def discard(agent_id: str):
+    """Drop an agent from the mirror (after delete)"""
+    _agent_ids.discard(agent_id)
+
+
+async def exists(db: AsyncSession, agent_id: str) -> bool:
+    """Check if an agent exists, querying the database only on a cache miss"""
+    if agent_id in _agent_ids:
+        return True
+
+    found = await db.scalar(select(AgentDB.id).where(AgentDB.id == agent_id))
+    if found is None:
+        return False
+    _agent_ids.add(agent_id)
+    return True
+
+
+async def load():
+    """Fill the mirror with every agent ID in the database (call on application startup)"""
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(select(AgentDB.id))
+        _agent_ids.update(result.scalars().all())
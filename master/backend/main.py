@@ -4,13 +4,28 @@ FastAPI-based RESTful API server
 """
 
 from fastapi import FastAPI
+from fastapi.encoders import jsonable_encoder
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import ORJSONResponse
+from fastapi.utils import is_body_allowed_for_status_code
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import Headers
+from starlette.exceptions import HTTPException as StarletteHTTPException
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.requests import Request
-from pathlib import Path
+from starlette.responses import FileResponse, Response
+from typing import Optional
+import os
+import stat
 import time
 
+import anyio
+
+import github_api
+import heartbeat
+import known_agents
+import pending_deployments
 from database import init_db
 from logging_config import request_logger, app_logger
 from metrics_collector import MetricsCollectorMiddleware
@@ -23,7 +38,23 @@ from config import (
 # Import routers
 from routers import agents, releases, deployments, settings, health
 
-app = FastAPI(title=APP_TITLE, version=APP_VERSION)
+# orjson encodes responses in C, much faster than the stdlib json default
+app = FastAPI(title=APP_TITLE, version=APP_VERSION, default_response_class=ORJSONResponse)
+
+
+# Error responses through orjson too (FastAPI's default handlers use the stdlib JSONResponse);
+# same bodies and status codes as the defaults
+@app.exception_handler(StarletteHTTPException)
+async def http_exception_handler(request: Request, exc: StarletteHTTPException):
+    headers = getattr(exc, "headers", None)
+    if not is_body_allowed_for_status_code(exc.status_code):
+        return Response(status_code=exc.status_code, headers=headers)
+    return ORJSONResponse({"detail": exc.detail}, status_code=exc.status_code, headers=headers)
+
+
+@app.exception_handler(RequestValidationError)
+async def request_validation_exception_handler(request: Request, exc: RequestValidationError):
+    return ORJSONResponse({"detail": jsonable_encoder(exc.errors())}, status_code=422)
 
 
 @app.on_event("startup")
@@ -32,13 +63,27 @@ async def startup_event():
     app_logger.info("Starting Master Agent Manager backend")
     await init_db()
     app_logger.info("Database initialized successfully")
+    await known_agents.load()
+    await pending_deployments.load()
+    await deployments.warm_query_cache()
     app_logger.info("Monitoring system enabled - logs in ./logs/ directory")
+    heartbeat.start()
+    github_api.start()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Write queued agent heartbeats and close the GitHub client before exiting"""
+    await heartbeat.stop()
+    await github_api.stop()
+    app_logger.info("Master Agent Manager backend stopped")
 
 
 # Request logging middleware
 class RequestLoggingMiddleware(BaseHTTPMiddleware):
     async def dispatch(self, request: Request, call_next):
-        start_time = time.time()
+        # perf_counter: monotonic, so wall-clock adjustments cannot skew request times
+        start_time = time.perf_counter()
         path = request.url.path
         method = request.method
         
@@ -47,7 +92,7 @@ class RequestLoggingMiddleware(BaseHTTPMiddleware):
         
         try:
             response = await call_next(request)
-            process_time = time.time() - start_time
+            process_time = time.perf_counter() - start_time
             
             # Log response
             request_logger.info(
@@ -57,7 +102,7 @@ class RequestLoggingMiddleware(BaseHTTPMiddleware):
             
             return response
         except Exception as e:
-            process_time = time.time() - start_time
+            process_time = time.perf_counter() - start_time
             request_logger.error(
                 f"{method} {path} - Error: {str(e)} - Time: {process_time:.3f}s",
                 exc_info=True
@@ -65,6 +110,48 @@ class RequestLoggingMiddleware(BaseHTTPMiddleware):
             raise
 
 
+class WildcardPreflightMiddleware:
+    """
+    Answer CORS preflight requests directly when every origin, method and header is allowed
+    The response only varies by the echoed Origin / requested headers, so the rest is built
+    once instead of CORSMiddleware re-evaluating the policy on every OPTIONS request
+    """
+    
+    # Same headers CORSMiddleware sends for a wildcard configuration
+    _STATIC_HEADERS = [
+        (b"access-control-allow-methods", b"DELETE, GET, HEAD, OPTIONS, PATCH, POST, PUT"),
+        (b"access-control-max-age", b"600"),
+        (b"vary", b"Origin"),
+        (b"content-type", b"text/plain; charset=utf-8"),
+        (b"content-length", b"2"),
+    ]
+    if CORS_ALLOW_CREDENTIALS:
+        _STATIC_HEADERS.append((b"access-control-allow-credentials", b"true"))
+    _BODY = {"type": "http.response.body", "body": b"OK"}
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "OPTIONS":
+            await self.app(scope, receive, send)
+            return
+        
+        headers = dict(scope["headers"])
+        origin = headers.get(b"origin")
+        if origin is None or b"access-control-request-method" not in headers:
+            await self.app(scope, receive, send)
+            return
+        
+        response_headers = [(b"access-control-allow-origin", origin), *self._STATIC_HEADERS]
+        requested_headers = headers.get(b"access-control-request-headers")
+        if requested_headers:
+            response_headers.append((b"access-control-allow-headers", requested_headers))
+        
+        await send({"type": "http.response.start", "status": 200, "headers": response_headers})
+        await send(self._BODY)
+
+
 # CORS configuration (for frontend connection)
 app.add_middleware(
     CORSMiddleware,
@@ -74,21 +161,64 @@ app.add_middleware(
     allow_headers=CORS_ALLOW_HEADERS,
 )
 
+# Preflight fast path (runs before CORSMiddleware), only valid for an allow-everything policy
+if CORS_ORIGINS == ["*"] and CORS_ALLOW_METHODS == ["*"] and CORS_ALLOW_HEADERS == ["*"]:
+    app.add_middleware(WildcardPreflightMiddleware)
+
 # Metrics collection middleware (must be before request logging to capture all requests)
 app.add_middleware(MetricsCollectorMiddleware)
 
 # Request logging middleware (must be after CORS and metrics)
 app.add_middleware(RequestLoggingMiddleware)
 
+class PrecompressedStaticFiles(StaticFiles):
+    """
+    StaticFiles that serves a precompressed sibling (asset.js.br / asset.js.gz) when the
+    client accepts that encoding; the files are written at build time by deploy-master.py
+    """
+    
+    # Preferred first
+    ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+    
+    async def get_response(self, path: str, scope):
+        response = await super().get_response(path, scope)
+        if response.status_code != 200 or not isinstance(response, FileResponse):
+            return response
+        
+        accept_encoding = Headers(scope=scope).get("accept-encoding", "")
+        for encoding, suffix in self.ENCODINGS:
+            if encoding not in accept_encoding:
+                continue
+            full_path, stat_result = await anyio.to_thread.run_sync(self.lookup_path, path + suffix)
+            if stat_result and stat.S_ISREG(stat_result.st_mode):
+                # Keep the media type of the original file, not of the .br/.gz file
+                return FileResponse(
+                    full_path,
+                    stat_result=stat_result,
+                    media_type=response.media_type,
+                    headers={"Content-Encoding": encoding, "Vary": "Accept-Encoding"},
+                )
+        
+        response.headers["Vary"] = "Accept-Encoding"
+        return response
+
+
+def _find_frontend_dist() -> Optional[str]:
+    """Get the first existing frontend build directory (one stat per candidate, stops at the first hit)"""
+    for path in FRONTEND_DIST_PATHS:
+        try:
+            os.stat(path)
+        except OSError:
+            continue
+        return path
+    return None
+
+
 # Serve static files (frontend build)
-frontend_dist = None
-for path in FRONTEND_DIST_PATHS:
-    if path.exists():
-        frontend_dist = path
-        break
+frontend_dist = _find_frontend_dist()
 
 if frontend_dist:
-    app.mount("/static", StaticFiles(directory=str(frontend_dist)), name="static")
+    app.mount("/static", PrecompressedStaticFiles(directory=frontend_dist), name="static")
 
 
 # Root endpoint
@@ -108,11 +238,13 @@ app.include_router(health.router)
 
 if __name__ == "__main__":
     import uvicorn
-    from config import HOST, PORT, RELOAD
+    from config import HOST, PORT, RELOAD, UVICORN_LOOP, UVICORN_HTTP
     
     uvicorn.run(
         "main:app",
         host=HOST,
         port=PORT,
-        reload=RELOAD
+        reload=RELOAD,
+        loop=UVICORN_LOOP,
+        http=UVICORN_HTTP,
     )
@@ -3,20 +3,102 @@ Metrics collection middleware
 Collects API metrics for monitoring
 """
 
+import threading
 import time
 from datetime import datetime
 from typing import Dict
-from collections import defaultdict, deque
+from collections import defaultdict
+import numpy as np
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.requests import Request
 from starlette.responses import Response
 
+from monitoring_cache import record_sample
+
+# Response-time samples kept per endpoint (most recent)
+RESPONSE_TIME_SAMPLES = 1000
+
+# Agent polling paths carry the agent ID; they are all recorded under one endpoint key
+PENDING_DEPLOYMENT_PATH_PREFIX = "/api/deployments/pending/"
+PENDING_DEPLOYMENT_ENDPOINT = f"GET {PENDING_DEPLOYMENT_PATH_PREFIX}:agent_id"
+
+
+class RingBuffer:
+    """
+    Fixed-size float32 ring buffer: the newest `capacity` samples, no per-sample objects
+    Count/sum/sum of squares/min/max over the stored samples are kept up to date on
+    push, so readers get them in O(1); an evicted sample is subtracted from the sums,
+    and min/max are only rescanned when the evicted sample was one of them
+    """
+    __slots__ = ("buf", "idx", "filled", "total", "total_sq", "lo", "hi", "extremes_stale")
+
+    def __init__(self, capacity: int = RESPONSE_TIME_SAMPLES):
+        self.buf = np.zeros(capacity, dtype=np.float32)
+        self.idx = 0
+        self.filled = 0
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.lo = float("inf")
+        self.hi = float("-inf")
+        self.extremes_stale = False
+
+    def push(self, value: float):
+        """Store a sample, overwriting the oldest one when full"""
+        if self.filled == len(self.buf):
+            evicted = float(self.buf[self.idx])
+            self.total -= evicted
+            self.total_sq -= evicted * evicted
+            if evicted <= self.lo or evicted >= self.hi:
+                self.extremes_stale = True
+        else:
+            self.filled += 1
+
+        self.buf[self.idx] = value
+        # Accumulate the stored (float32-rounded) value so eviction subtracts exactly what was added
+        stored = float(self.buf[self.idx])
+        self.total += stored
+        self.total_sq += stored * stored
+        if not self.extremes_stale:
+            self.lo = min(self.lo, stored)
+            self.hi = max(self.hi, stored)
+        self.idx = (self.idx + 1) % len(self.buf)
+
+    def snapshot(self) -> np.ndarray:
+        """View (not a copy) of the stored samples, in no particular order"""
+        return self.buf[:self.filled]
+
+    def aggregates(self) -> Dict[str, float]:
+        """Count, sum, sum of squares, min and max of the stored samples (non-empty buffer)"""
+        if self.extremes_stale:
+            samples = self.snapshot()
+            self.lo = float(samples.min())
+            self.hi = float(samples.max())
+            self.extremes_stale = False
+        return {
+            "count": self.filled,
+            "sum": self.total,
+            "sum_sq": self.total_sq,
+            "min": self.lo,
+            "max": self.hi,
+        }
+
+    def __len__(self) -> int:
+        return self.filled
+
+
 # Metrics storage (in-memory)
 request_counts: Dict[str, int] = defaultdict(int)
-response_times: Dict[str, deque] = defaultdict(lambda: deque(maxlen=1000))
+response_times: Dict[str, RingBuffer] = defaultdict(RingBuffer)
 error_counts: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
 total_requests: int = 0
 start_time: datetime = datetime.now()
+# Uptime is measured on the monotonic clock: no local-time lookup per read, and
+# not skewed by DST or wall-clock adjustments the way start_time subtraction is
+_start_monotonic: float = time.monotonic()
+
+# Guards the storage above: a ring-buffer push updates several fields, and readers
+# need one consistent view across the dicts (required on free-threaded builds)
+_metrics_lock = threading.RLock()
 
 
 class MetricsCollectorMiddleware(BaseHTTPMiddleware):
@@ -25,9 +107,11 @@ class MetricsCollectorMiddleware(BaseHTTPMiddleware):
     async def dispatch(self, request: Request, call_next):
         path = request.url.path
         method = request.method
+        if path.startswith(PENDING_DEPLOYMENT_PATH_PREFIX):
+            path = f"{PENDING_DEPLOYMENT_PATH_PREFIX}:agent_id"
         endpoint = f"{method} {path}"
         
-        start = time.time()
+        start = time.perf_counter()
         status_code = 200
         
         try:
@@ -39,28 +123,48 @@ class MetricsCollectorMiddleware(BaseHTTPMiddleware):
             raise
         finally:
             # Record metrics
-            elapsed_time = (time.time() - start) * 1000  # Convert to milliseconds
-            
-            # Update request count
-            request_counts[endpoint] += 1
-            global total_requests
-            total_requests += 1
+            elapsed_time = (time.perf_counter() - start) * 1000  # Convert to milliseconds
             
-            # Record response time
-            response_times[endpoint].append(elapsed_time)
-            
-            # Record error counts
-            if status_code >= 400:
-                error_counts[endpoint][str(status_code)] += 1
+            with _metrics_lock:
+                # Update request count
+                request_counts[endpoint] += 1
+                global total_requests
+                total_requests += 1
+                
+                # Record response time
+                response_times[endpoint].push(elapsed_time)
+                
+                # Record error counts
+                if status_code >= 400:
+                    error_counts[endpoint][str(status_code)] += 1
+            record_sample()
 
 
 def get_metrics() -> Dict:
-    """Get current metrics (exported for monitoring module)"""
-    return {
-        'request_counts': dict(request_counts),
-        'response_times': {k: list(v) for k, v in response_times.items()},
-        'error_counts': {k: dict(v) for k, v in error_counts.items()},
-        'total_requests': total_requests,
-        'start_time': start_time
-    }
+    """
+    Get current metrics (exported for monitoring module)
+    Copied under the lock, so samples, aggregates and counters form one consistent
+    snapshot that later pushes cannot change while percentiles are computed
+    """
+    with _metrics_lock:
+        return {
+            'request_counts': dict(request_counts),
+            'response_times': {k: v.snapshot().copy() for k, v in response_times.items()},  # float32 arrays
+            'response_time_aggregates': {k: v.aggregates() for k, v in response_times.items() if len(v) > 0},
+            'error_counts': {k: dict(v) for k, v in error_counts.items()},
+            'total_requests': total_requests,
+            'start_time': start_time,
+            'uptime_seconds': time.monotonic() - _start_monotonic
+        }
+
 
+def reset():
+    """Clear all collected metrics and restart the uptime clock"""
+    global total_requests, start_time, _start_monotonic
+    with _metrics_lock:
+        request_counts.clear()
+        response_times.clear()
+        error_counts.clear()
+        total_requests = 0
+        start_time = datetime.now()
+        _start_monotonic = time.monotonic()
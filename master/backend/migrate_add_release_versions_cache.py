@@ -0,0 +1,47 @@
+"""
+Migration script to add the GitHub versions cache columns to releases table
+versions_etag holds the ETag of the last GitHub releases response and
+cached_versions its parsed versions, so unchanged lists are answered from a 304
+"""
+import asyncio
+import os
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy import text
+
+DATABASE_URL = os.getenv(
+    "DATABASE_URL",
+    "sqlite+aiosqlite:///./master.db"
+)
+
+IS_SQLITE = DATABASE_URL.startswith("sqlite+aiosqlite")
+
+
+async def migrate():
+    """Add versions_etag and cached_versions columns to releases"""
+    engine = create_async_engine(DATABASE_URL, echo=True)
+    
+    async with engine.begin() as conn:
+        if IS_SQLITE:
+            result = await conn.execute(text("PRAGMA table_info(releases)"))
+            columns = {row[1] for row in result}
+            if "versions_etag" not in columns:
+                await conn.execute(text("ALTER TABLE releases ADD COLUMN versions_etag TEXT"))
+            if "cached_versions" not in columns:
+                await conn.execute(text("ALTER TABLE releases ADD COLUMN cached_versions JSON"))
+            print("✅ Migration completed for SQLite")
+        else:
+            await conn.execute(text("ALTER TABLE releases ADD COLUMN IF NOT EXISTS versions_etag TEXT"))
+            await conn.execute(text("ALTER TABLE releases ADD COLUMN IF NOT EXISTS cached_versions JSON"))
+            print("✅ Migration completed for PostgreSQL")
+    
+    await engine.dispose()
+    print("Migration script completed successfully!")
+
+
+if __name__ == "__main__":
+    print("Starting migration: Add GitHub versions cache columns to releases table")
+    response = input("Continue? (yes/no): ")
+    if response.lower() == "yes":
+        asyncio.run(migrate())
+    else:
+        print("Migration cancelled")
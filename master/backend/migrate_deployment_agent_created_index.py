@@ -0,0 +1,39 @@
+"""
+Migration script to replace the standalone agent_id index on the deployments table
+with a composite (agent_id, created_at) index
+One agent's deployments are then read newest first straight from the index (no sort);
+agent_id lookups are still served by the index prefix
+"""
+import asyncio
+import os
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy import text
+
+DATABASE_URL = os.getenv(
+    "DATABASE_URL",
+    "sqlite+aiosqlite:///./master.db"
+)
+
+
+async def migrate():
+    """Create idx_deployment_agent_created and drop ix_deployments_agent_id"""
+    engine = create_async_engine(DATABASE_URL, echo=True)
+    
+    async with engine.begin() as conn:
+        await conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS idx_deployment_agent_created ON deployments (agent_id, created_at)"
+        ))
+        await conn.execute(text("DROP INDEX IF EXISTS ix_deployments_agent_id"))
+        print("✅ Migration completed")
+    
+    await engine.dispose()
+    print("Migration script completed successfully!")
+
+
+if __name__ == "__main__":
+    print("Starting migration: Replace ix_deployments_agent_id with idx_deployment_agent_created")
+    response = input("Continue? (yes/no): ")
+    if response.lower() == "yes":
+        asyncio.run(migrate())
+    else:
+        print("Migration cancelled")
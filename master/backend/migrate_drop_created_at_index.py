@@ -0,0 +1,44 @@
+"""
+Migration script to drop the standalone created_at index from deployments table
+The composite (agent_id, status, created_at) index covers per-agent ordering;
+PostgreSQL gets a covering (created_at, id) index for global history ordering instead
+"""
+import asyncio
+import os
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy import text
+
+DATABASE_URL = os.getenv(
+    "DATABASE_URL",
+    "sqlite+aiosqlite:///./master.db"
+)
+
+IS_SQLITE = DATABASE_URL.startswith("sqlite+aiosqlite")
+
+
+async def migrate():
+    """Drop idx_deployment_created_at (and add idx_deployment_created_desc on PostgreSQL)"""
+    engine = create_async_engine(DATABASE_URL, echo=True)
+    
+    async with engine.begin() as conn:
+        await conn.execute(text("DROP INDEX IF EXISTS idx_deployment_created_at"))
+        
+        if IS_SQLITE:
+            print("✅ Migration completed for SQLite")
+        else:
+            await conn.execute(text(
+                "CREATE INDEX IF NOT EXISTS idx_deployment_created_desc ON deployments USING btree (created_at, id)"
+            ))
+            print("✅ Migration completed for PostgreSQL")
+    
+    await engine.dispose()
+    print("Migration script completed successfully!")
+
+
+if __name__ == "__main__":
+    print("Starting migration: Drop idx_deployment_created_at from deployments table")
+    response = input("Continue? (yes/no): ")
+    if response.lower() == "yes":
+        asyncio.run(migrate())
+    else:
+        print("Migration cancelled")
@@ -0,0 +1,38 @@
+"""
+Migration script to drop the secondary indexes on primary-key columns
+agents.id, releases.id, deployments.id and settings.key are already indexed by
+their primary key; the extra ix_* index duplicated every lookup structure and
+cost one more B-tree write per insert
+"""
+import asyncio
+import os
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy import text
+
+DATABASE_URL = os.getenv(
+    "DATABASE_URL",
+    "sqlite+aiosqlite:///./master.db"
+)
+
+REDUNDANT_INDEXES = ("ix_agents_id", "ix_releases_id", "ix_deployments_id", "ix_settings_key")
+
+
+async def migrate():
+    """Drop the ix_* indexes duplicating primary keys"""
+    engine = create_async_engine(DATABASE_URL, echo=True)
+    
+    async with engine.begin() as conn:
+        for index_name in REDUNDANT_INDEXES:
+            await conn.execute(text(f"DROP INDEX IF EXISTS {index_name}"))
+    
+    await engine.dispose()
+    print("Migration script completed successfully!")
+
+
+if __name__ == "__main__":
+    print("Starting migration: Drop indexes duplicating primary keys")
+    response = input("Continue? (yes/no): ")
+    if response.lower() == "yes":
+        asyncio.run(migrate())
+    else:
+        print("Migration cancelled")
@@ -0,0 +1,119 @@
+"""
+Migration script to store agent and deployment status as SMALLINT codes
+Existing rows hold the enum member name (e.g. 'IN_PROGRESS'); they are converted
+to the member position used by db_models.SmallIntEnum
+"""
+import asyncio
+import os
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy import text
+
+from db_models import AgentDB, AgentStatusEnum, DeploymentDB, DeploymentStatusEnum
+
+DATABASE_URL = os.getenv(
+    "DATABASE_URL",
+    "sqlite+aiosqlite:///./master.db"
+)
+
+IS_SQLITE = DATABASE_URL.startswith("sqlite+aiosqlite")
+
+
+def status_case(enum_class) -> str:
+    """SQL CASE expression mapping the stored member name to its SMALLINT code"""
+    whens = " ".join(
+        f"WHEN '{member.name}' THEN {code}" for code, member in enumerate(enum_class)
+    )
+    return f"CASE CAST(status AS TEXT) {whens} END"
+
+
+async def migrate():
+    """Convert agents.status and deployments.status to SMALLINT"""
+    engine = create_async_engine(DATABASE_URL, echo=True)
+    
+    async with engine.begin() as conn:
+        if IS_SQLITE:
+            # SQLite can't change a column type in place (and VARCHAR affinity
+            # would keep the codes as text), so recreate both tables
+            print("SQLite detected - recreating agents and deployments tables...")
+            
+            # Step 1: Create new tables with SMALLINT status
+            await conn.execute(text("""
+                CREATE TABLE agents_new (
+                    id VARCHAR NOT NULL PRIMARY KEY,
+                    name VARCHAR NOT NULL,
+                    platform VARCHAR NOT NULL,
+                    version VARCHAR NOT NULL,
+                    status SMALLINT NOT NULL,
+                    last_seen DATETIME NOT NULL,
+                    ip_address VARCHAR
+                )
+            """))
+            await conn.execute(text("""
+                CREATE TABLE deployments_new (
+                    id VARCHAR NOT NULL PRIMARY KEY,
+                    agent_id VARCHAR NOT NULL REFERENCES agents(id) ON DELETE CASCADE,
+                    release_ids JSON NOT NULL,
+                    release_tags JSON NOT NULL,
+                    status SMALLINT NOT NULL,
+                    created_at DATETIME NOT NULL,
+                    started_at DATETIME,
+                    completed_at DATETIME,
+                    error_message TEXT
+                )
+            """))
+            
+            # Step 2: Copy data, converting status names to codes
+            await conn.execute(text(f"""
+                INSERT INTO agents_new
+                (id, name, platform, version, status, last_seen, ip_address)
+                SELECT
+                    id, name, platform, version, {status_case(AgentStatusEnum)}, last_seen, ip_address
+                FROM agents
+            """))
+            await conn.execute(text(f"""
+                INSERT INTO deployments_new
+                (id, agent_id, release_ids, release_tags, status, created_at, started_at, completed_at, error_message)
+                SELECT
+                    id, agent_id, release_ids, release_tags, {status_case(DeploymentStatusEnum)},
+                    created_at, started_at, completed_at, error_message
+                FROM deployments
+            """))
+            
+            # Step 3: Drop old tables
+            await conn.execute(text("DROP TABLE deployments"))
+            await conn.execute(text("DROP TABLE agents"))
+            
+            # Step 4: Rename new tables
+            await conn.execute(text("ALTER TABLE agents_new RENAME TO agents"))
+            await conn.execute(text("ALTER TABLE deployments_new RENAME TO deployments"))
+            
+            # Step 5: Recreate indexes from the models, so the result matches create_all
+            for table in (AgentDB.__table__, DeploymentDB.__table__):
+                for index in table.indexes:
+                    await conn.run_sync(index.create)
+            
+            print("✅ Migration completed for SQLite")
+        else:
+            # PostgreSQL: convert in place, then drop the named ENUM types
+            print("PostgreSQL detected - converting status columns to SMALLINT...")
+            await conn.execute(text(
+                f"ALTER TABLE agents ALTER COLUMN status TYPE SMALLINT USING {status_case(AgentStatusEnum)}"
+            ))
+            await conn.execute(text(
+                f"ALTER TABLE deployments ALTER COLUMN status TYPE SMALLINT USING {status_case(DeploymentStatusEnum)}"
+            ))
+            await conn.execute(text("DROP TYPE IF EXISTS agentstatusenum"))
+            await conn.execute(text("DROP TYPE IF EXISTS deploymentstatusenum"))
+            print("✅ Migration completed for PostgreSQL")
+    
+    await engine.dispose()
+    print("Migration script completed successfully!")
+
+
+if __name__ == "__main__":
+    print("Starting migration: Store agent and deployment status as SMALLINT")
+    response = input("Continue? (yes/no): ")
+    if response.lower() == "yes":
+        asyncio.run(migrate())
+    else:
+        print("Migration cancelled")
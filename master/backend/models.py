@@ -3,7 +3,8 @@ Data models for Master backend
 Following Clean Architecture principles
 """
 
-from pydantic import BaseModel
+import msgspec
+from pydantic import AliasChoices, AliasPath, BaseModel, ConfigDict, Field, field_validator
 from typing import List, Optional
 from datetime import datetime
 from enum import Enum
@@ -35,30 +36,62 @@ class Agent(BaseModel):
     ip_address: Optional[str] = None
 
 
-class AgentRegister(BaseModel):
-    """Agent registration request model"""
+class AgentRegister(msgspec.Struct):
+    """
+    Agent registration / heartbeat request model
+    msgspec Struct (not Pydantic): sent by every agent every few seconds and
+    decoded straight from the request body bytes
+    """
     name: str
     platform: str
     version: str
     ip_address: Optional[str] = None
 
 
+# Inline JSON schema of AgentRegister for the OpenAPI docs (the body is decoded manually)
+AGENT_REGISTER_SCHEMA = msgspec.json.schema_components([AgentRegister])[1]["AgentRegister"]
+
+
 class AgentUpdate(BaseModel):
     """Agent update request model"""
     name: Optional[str] = None
 
 
-class Release(BaseModel):
-    """Release model (GitHub Release)"""
+class ReleaseSummary(BaseModel):
+    """
+    Release model without description/assets (release pickers and lists)
+    Built from a ReleaseDB row or a column-only select row; an unset version
+    column (NULL) becomes ""
+    """
+    model_config = ConfigDict(from_attributes=True)
+
     id: str  # GitHub release ID or tag name
     tag_name: str
     name: str
     version: str
     release_date: datetime
     download_url: Optional[str] = None
+
+    @field_validator("version", mode="before")
+    @classmethod
+    def _version_or_empty(cls, value):
+        return value or ""
+
+
+class Release(ReleaseSummary):
+    """
+    Release model (GitHub Release)
+    Built straight from a ReleaseDB row with Release.model_validate; unset
+    version/assets columns (NULL) become "" and []
+    """
     description: Optional[str] = None
     assets: List[str] = []  # List of artifact file names
 
+    @field_validator("assets", mode="before")
+    @classmethod
+    def _assets_or_empty(cls, value):
+        return value or []
+
 
 class ReleaseCreate(BaseModel):
     """Release creation request model"""
@@ -73,10 +106,19 @@ class ReleaseUpdate(BaseModel):
 
 
 class Deployment(BaseModel):
-    """Deployment model"""
+    """
+    Deployment model
+    Built straight from a DeploymentDB row with Deployment.model_validate (attributes
+    are read by pydantic-core); agent_name comes from the row's loaded agent
+    """
+    model_config = ConfigDict(from_attributes=True)
+
     id: str
     agent_id: str
-    agent_name: str
+    agent_name: str = Field(
+        "Unknown",
+        validation_alias=AliasChoices(AliasPath("agent", "name"), "agent_name"),
+    )
     release_ids: List[str]  # Multiple releases can be deployed at once
     release_tags: List[str]  # Release tag names for display
     status: DeploymentStatus
@@ -86,6 +128,14 @@ class Deployment(BaseModel):
     error_message: Optional[str] = None
 
 
+class DeploymentPage(BaseModel):
+    """One page of deployments, newest first"""
+    items: List[Deployment]
+    total: int  # Deployments matching the filters, across all pages
+    limit: int
+    offset: int
+
+
 class DeploymentCreate(BaseModel):
     """Deployment creation request model"""
     agent_id: str
@@ -4,18 +4,16 @@ Simple metrics tracking for small-scale deployments (Agent < 50)
 """
 
 import time
-from datetime import datetime
 from typing import Dict, List, Optional
-from collections import defaultdict, deque
+from collections import defaultdict
 import logging
 from pathlib import Path
 
-# Metrics storage (in-memory for simplicity)
-request_counts: Dict[str, int] = defaultdict(int)  # endpoint -> count
-response_times: Dict[str, deque] = defaultdict(lambda: deque(maxlen=1000))  # endpoint -> response times
-error_counts: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))  # endpoint -> {status_code: count}
-total_requests: int = 0
-start_time: datetime = datetime.now()
+import numpy as np
+
+import metrics_collector
+from metrics_collector import get_metrics as get_collected_metrics
+from monitoring_cache import ttl_cache, invalidate as invalidate_metrics_cache
 
 logger = logging.getLogger(__name__)
 
@@ -24,17 +22,65 @@ logger = logging.getLogger(__name__)
 # This module provides utility functions to read and aggregate metrics
 
 
+def _response_time_stats_batch(
+    samples: List[np.ndarray], aggregates: List[Dict[str, float]]
+) -> List[Dict[str, float]]:
+    """
+    Mean/min/max and p50/p95/p99 for each non-empty array of response times (ms)
+    Mean/min/max come from the running aggregates kept by the ring buffers (O(1));
+    only the percentiles touch the samples. Arrays with the same length (all saturated
+    ring buffers) are stacked into one matrix and partitioned along axis 1 together
+    Percentiles use the index rule int(n * q) into the sorted samples (no interpolation);
+    np.partition places just those three order statistics in O(n) instead of sorting
+    """
+    stats: List[Optional[Dict[str, float]]] = [None] * len(samples)
+    
+    positions_by_length: Dict[int, List[int]] = defaultdict(list)
+    for position, times in enumerate(samples):
+        positions_by_length[len(times)].append(position)
+    
+    for n, positions in positions_by_length.items():
+        matrix = np.stack([samples[position] for position in positions])
+        ranks = [min(int(n * q), n - 1) for q in (0.5, 0.95, 0.99)]
+        percentiles = np.partition(matrix, ranks, axis=1)[:, ranks]
+        
+        for row, position in enumerate(positions):
+            aggregate = aggregates[position]
+            p50, p95, p99 = percentiles[row]
+            stats[position] = {
+                "mean": aggregate["sum"] / aggregate["count"],
+                "min": aggregate["min"],
+                "max": aggregate["max"],
+                "p50": float(p50),
+                "p95": float(p95),
+                "p99": float(p99),
+            }
+    
+    return stats
+
+
+def _response_time_stats(times: np.ndarray, aggregate: Dict[str, float]) -> Dict[str, float]:
+    """Mean/min/max and p50/p95/p99 of a non-empty array of response times (ms)"""
+    return _response_time_stats_batch([times], [aggregate])[0]
+
+
+def reset_metrics():
+    """Clear every collected sample and counter, and the cached summaries"""
+    metrics_collector.reset()
+    invalidate_metrics_cache()
+
+
+@ttl_cache()
 def get_metrics_summary() -> Dict:
     """Get current metrics summary"""
     collected = get_collected_metrics()
     
     request_counts = collected['request_counts']
-    response_times = {k: v for k, v in collected['response_times'].items()}
+    response_times = collected['response_times']
+    response_time_aggregates = collected['response_time_aggregates']
     error_counts = collected['error_counts']
     total_requests = collected['total_requests']
-    start_time_obj = collected['start_time']
-    
-    uptime = (datetime.now() - start_time_obj).total_seconds()
+    uptime = collected['uptime_seconds']
     
     summary = {
         "uptime_seconds": uptime,
@@ -43,28 +89,22 @@ def get_metrics_summary() -> Dict:
         "endpoints": {}
     }
     
-    for endpoint, count in request_counts.items():
-        times = response_times.get(endpoint, [])
-        
-        if not times:
-            continue
-        
-        sorted_times = sorted(times)
-        p50_idx = int(len(sorted_times) * 0.5)
-        p95_idx = int(len(sorted_times) * 0.95)
-        p99_idx = int(len(sorted_times) * 0.99)
-        
+    # Endpoints with samples, in insertion order; stats for all of them in one batch
+    endpoints = [
+        endpoint for endpoint in request_counts
+        if endpoint in response_times and len(response_times[endpoint]) > 0
+    ]
+    endpoint_stats = _response_time_stats_batch(
+        [response_times[endpoint] for endpoint in endpoints],
+        [response_time_aggregates[endpoint] for endpoint in endpoints],
+    )
+    
+    for endpoint, stats in zip(endpoints, endpoint_stats):
+        count = request_counts[endpoint]
         summary["endpoints"][endpoint] = {
             "request_count": count,
             "rps": count / uptime if uptime > 0 else 0,
-            "response_time_ms": {
-                "mean": sum(times) / len(times),
-                "min": min(times),
-                "max": max(times),
-                "p50": sorted_times[p50_idx] if p50_idx < len(sorted_times) else sorted_times[-1],
-                "p95": sorted_times[p95_idx] if p95_idx < len(sorted_times) else sorted_times[-1],
-                "p99": sorted_times[p99_idx] if p99_idx < len(sorted_times) else sorted_times[-1],
-            },
+            "response_time_ms": stats,
             "errors": error_counts.get(endpoint, {}),
             "error_rate": sum(error_counts.get(endpoint, {}).values()) / count if count > 0 else 0
         }
@@ -72,12 +112,9 @@ def get_metrics_summary() -> Dict:
     return summary
 
 
+@ttl_cache()
 def get_pending_deployment_metrics() -> Dict:
     """Get specific metrics for /api/deployments/pending/{agent_id} endpoint"""
-    from collections import defaultdict
-    
-    endpoint_pattern = "GET /api/deployments/pending/"
-    
     metrics = {
         "total_requests": 0,
         "rps": 0,
@@ -92,45 +129,27 @@ def get_pending_deployment_metrics() -> Dict:
     }
     
     collected = get_collected_metrics()
-    request_counts = collected['request_counts']
-    response_times = collected['response_times']
-    error_counts = collected['error_counts']
-    start_time_obj = collected['start_time']
-    
-    # Aggregate all pending deployment endpoint requests
-    pending_endpoints = [ep for ep in request_counts.keys() if endpoint_pattern in ep]
-    
-    if not pending_endpoints:
-        return metrics
-    
-    total_count = sum(request_counts[ep] for ep in pending_endpoints)
-    all_times = []
-    all_errors = defaultdict(int)
-    
-    for ep in pending_endpoints:
-        times = response_times.get(ep, [])
-        all_times.extend(times)
-        for status, count in error_counts.get(ep, {}).items():
-            all_errors[status] += count
     
-    if not all_times:
+    # Every polling request is recorded under one endpoint key (agent ID stripped)
+    endpoint = metrics_collector.PENDING_DEPLOYMENT_ENDPOINT
+    total_count = collected['request_counts'].get(endpoint, 0)
+    times = collected['response_times'].get(endpoint)
+    if not total_count or times is None or len(times) == 0:
         return metrics
     
-    uptime = (datetime.now() - start_time_obj).total_seconds()
-    sorted_times = sorted(all_times)
-    p50_idx = int(len(sorted_times) * 0.5)
-    p95_idx = int(len(sorted_times) * 0.95)
-    p99_idx = int(len(sorted_times) * 0.99)
+    errors = collected['error_counts'].get(endpoint, {})
+    stats = _response_time_stats(times, collected['response_time_aggregates'][endpoint])
+    uptime = collected['uptime_seconds']
     
     metrics["total_requests"] = total_count
     metrics["rps"] = total_count / uptime if uptime > 0 else 0
     metrics["response_time_ms"] = {
-        "mean": sum(all_times) / len(all_times),
-        "p50": sorted_times[p50_idx] if p50_idx < len(sorted_times) else sorted_times[-1],
-        "p95": sorted_times[p95_idx] if p95_idx < len(sorted_times) else sorted_times[-1],
-        "p99": sorted_times[p99_idx] if p99_idx < len(sorted_times) else sorted_times[-1],
+        "mean": stats["mean"],
+        "p50": stats["p50"],
+        "p95": stats["p95"],
+        "p99": stats["p99"],
     }
-    metrics["errors"] = dict(all_errors)
-    metrics["error_rate"] = sum(all_errors.values()) / total_count if total_count > 0 else 0
+    metrics["errors"] = errors
+    metrics["error_rate"] = sum(errors.values()) / total_count
     
     return metrics
@@ -0,0 +1,61 @@
+"""
+TTL cache for monitoring summaries
+Percentile summaries are recomputed at most once per TTL instead of on every
+dashboard poll; the request path only bumps a counter
+"""
+
+import threading
+import time
+from functools import wraps
+from typing import Any, Callable, Dict, Tuple
+
+from config import METRICS_CACHE_ENABLED, METRICS_CACHE_TTL_SECONDS, METRICS_CACHE_DIRTY_THRESHOLD
+
+# Cache key -> (expires_at, value)
+_entries: Dict[str, Tuple[float, Any]] = {}
+_lock = threading.Lock()
+
+# Samples recorded since the cache was last cleared
+_dirty_samples = 0
+
+
+def invalidate():
+    """Drop every cached summary"""
+    global _dirty_samples
+    with _lock:
+        _entries.clear()
+        _dirty_samples = 0
+
+
+def record_sample():
+    """Count a new sample; a burst of METRICS_CACHE_DIRTY_THRESHOLD samples invalidates the cache early"""
+    global _dirty_samples
+    _dirty_samples += 1
+    if _dirty_samples >= METRICS_CACHE_DIRTY_THRESHOLD:
+        invalidate()
+
+
+def ttl_cache(seconds: float = METRICS_CACHE_TTL_SECONDS) -> Callable:
+    """Cache a no-argument function's result for `seconds` (keyed by function name)"""
+    def decorator(func: Callable) -> Callable:
+        if not METRICS_CACHE_ENABLED:
+            return func
+
+        key = f"{func.__module__}.{func.__qualname__}"
+
+        @wraps(func)
+        def wrapper():
+            now = time.monotonic()
+            with _lock:
+                entry = _entries.get(key)
+                if entry is not None and entry[0] > now:
+                    return entry[1]
+
+            value = func()
+            with _lock:
+                _entries[key] = (now + seconds, value)
+            return value
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,41 @@
+"""
+In-process set of agents that have PENDING deployments
+Agents poll for work every few seconds and almost always have none; the poll
+answers from this set without touching the database until work is queued
+"""
+
+from typing import Set
+
+from sqlalchemy import select
+
+from database import AsyncSessionLocal
+from db_models import DeploymentDB, DeploymentStatusEnum
+
+# Agent IDs with at least one PENDING deployment
+_agent_ids: Set[str] = set()
+
+
+def add(agent_id: str):
+    """Record that an agent has pending work (after creating a deployment)"""
+    _agent_ids.add(agent_id)
+
+
+def discard(agent_id: str):
+    """Record that an agent has no pending work left"""
+    _agent_ids.discard(agent_id)
+
+
+def has_pending(agent_id: str) -> bool:
+    """Check if an agent may have a PENDING deployment"""
+    return agent_id in _agent_ids
+
+
+async def load():
+    """Fill the set from the database (call on application startup)"""
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(
+            select(DeploymentDB.agent_id)
+            .where(DeploymentDB.status == DeploymentStatusEnum.PENDING)
+            .distinct()
+        )
+        _agent_ids.update(result.scalars().all())
@@ -2,16 +2,19 @@
 Agent Management Routes
 """
 
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, delete
+from sqlalchemy import select, update, delete, bindparam, lambda_stmt
 from typing import List
-from datetime import datetime
+from datetime import datetime, timedelta
 import uuid
+import msgspec
 
+import heartbeat
+import known_agents
 from database import get_db
 from db_models import AgentDB, AgentStatusEnum
-from models import Agent, AgentRegister, AgentUpdate, AgentStatus
+from models import Agent, AgentRegister, AgentUpdate, AgentStatus, AGENT_REGISTER_SCHEMA
 
 router = APIRouter(prefix="/api/agents", tags=["agents"])
 
@@ -19,19 +22,40 @@ router = APIRouter(prefix="/api/agents", tags=["agents"])
 # Agent sends heartbeat every 10 seconds, so 30 seconds gives 3 missed heartbeats tolerance
 HEARTBEAT_TIMEOUT_SECONDS = 30
 
+# Register/heartbeat body decoder, built once (decodes JSON bytes straight into AgentRegister)
+_agent_register_decoder = msgspec.json.Decoder(AgentRegister)
 
-def _should_be_offline(agent_db: AgentDB) -> bool:
+# Agent lookup by ID, built once: lambda_stmt caches the statement and its cache key,
+# so repeated lookups skip statement construction and go straight to the compiled SQL
+_select_agent_by_id = lambda_stmt(lambda: select(AgentDB).where(AgentDB.id == bindparam("agent_id")))
+
+
+# Handlers read datetime.now() once and pass the value (or a cutoff built from it)
+# down, so each request has one timestamp; a Depends(get_now) dependency would add
+# ~15 us per request (~120 us as a sync dependency, run in the threadpool) to save
+# one ~1 us clock read
+def _offline_cutoff() -> datetime:
+    """Agents last seen before this moment are considered offline"""
+    return datetime.now() - timedelta(seconds=HEARTBEAT_TIMEOUT_SECONDS)
+
+
+def _last_seen(agent_db: AgentDB) -> datetime:
+    """Agent's last_seen, including heartbeats not written to the database yet"""
+    pending = heartbeat.last_seen(agent_db.id)
+    if pending and (not agent_db.last_seen or pending > agent_db.last_seen):
+        return pending
+    return agent_db.last_seen
+
+
+def _should_be_offline(agent_db: AgentDB, cutoff: datetime) -> bool:
     """Check if agent should be considered offline based on last_seen timestamp"""
-    if not agent_db.last_seen:
-        return True
-    
-    time_since_last_seen = datetime.now() - agent_db.last_seen
-    return time_since_last_seen.total_seconds() > HEARTBEAT_TIMEOUT_SECONDS
+    last_seen = _last_seen(agent_db)
+    return not last_seen or last_seen < cutoff
 
 
 async def _get_agent_status(agent_db: AgentDB, db: AsyncSession) -> AgentStatusEnum:
     """Get agent status, updating to OFFLINE if heartbeat timeout exceeded"""
-    if _should_be_offline(agent_db):
+    if _should_be_offline(agent_db, _offline_cutoff()):
         # Update status in database if it's still marked as ONLINE
         if agent_db.status == AgentStatusEnum.ONLINE:
             agent_db.status = AgentStatusEnum.OFFLINE
@@ -47,10 +71,16 @@ async def get_agents(db: AsyncSession = Depends(get_db)):
     result = await db.execute(select(AgentDB))
     agents_db = result.scalars().all()
     
+    # Check status based on last_seen (one cutoff for the whole list)
+    cutoff = _offline_cutoff()
+    timed_out_ids = []
     agents = []
     for agent_db in agents_db:
-        # Check and update status based on last_seen
-        current_status = await _get_agent_status(agent_db, db)
+        current_status = agent_db.status
+        if _should_be_offline(agent_db, cutoff):
+            if current_status == AgentStatusEnum.ONLINE:
+                timed_out_ids.append(agent_db.id)
+            current_status = AgentStatusEnum.OFFLINE
         
         agents.append(
             Agent(
@@ -59,18 +89,31 @@ async def get_agents(db: AsyncSession = Depends(get_db)):
                 platform=agent_db.platform,
                 version=agent_db.version,
                 status=AgentStatus(current_status.value),
-                last_seen=agent_db.last_seen,
+                last_seen=_last_seen(agent_db),
                 ip_address=agent_db.ip_address,
             )
         )
     
+    # Mark every timed-out agent OFFLINE in one UPDATE / commit
+    # (last_seen is re-checked so a heartbeat written meanwhile is not overridden)
+    if timed_out_ids:
+        await db.execute(
+            update(AgentDB)
+            .where(AgentDB.id.in_(timed_out_ids))
+            .where(AgentDB.status == AgentStatusEnum.ONLINE)
+            .where(AgentDB.last_seen < cutoff)
+            .values(status=AgentStatusEnum.OFFLINE)
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+    
     return agents
 
 
 @router.get("/{agent_id}", response_model=Agent)
 async def get_agent(agent_id: str, db: AsyncSession = Depends(get_db)):
     """Get specific agent"""
-    result = await db.execute(select(AgentDB).where(AgentDB.id == agent_id))
+    result = await db.execute(_select_agent_by_id, {"agent_id": agent_id})
     agent_db = result.scalar_one_or_none()
     
     if not agent_db:
@@ -85,14 +128,44 @@ async def get_agent(agent_id: str, db: AsyncSession = Depends(get_db)):
         platform=agent_db.platform,
         version=agent_db.version,
         status=AgentStatus(current_status.value),
-        last_seen=agent_db.last_seen,
+        last_seen=_last_seen(agent_db),
         ip_address=agent_db.ip_address,
     )
 
 
-@router.post("/register", response_model=Agent)
-async def register_agent(agent_data: AgentRegister, db: AsyncSession = Depends(get_db)):
+@router.post(
+    "/register",
+    response_model=Agent,
+    openapi_extra={"requestBody": {"required": True, "content": {"application/json": {"schema": AGENT_REGISTER_SCHEMA}}}},
+)
+async def register_agent(request: Request, db: AsyncSession = Depends(get_db)):
     """Register agent / heartbeat"""
+    # Decode the body straight into the struct (no intermediate dict or Pydantic model)
+    try:
+        agent_data = _agent_register_decoder.decode(await request.body())
+    except msgspec.DecodeError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    
+    # Heartbeat from a known agent: queue the update and answer immediately
+    known_agent_id = heartbeat.lookup_agent_id(agent_data.name)
+    if known_agent_id:
+        received_at = datetime.now()
+        heartbeat.submit(known_agent_id, agent_data, received_at)
+        # Returning a response directly skips re-validation against response_model
+        return Response(
+            content=msgspec.json.encode({
+                "id": known_agent_id,
+                "name": agent_data.name,
+                "platform": agent_data.platform,
+                "version": agent_data.version,
+                "status": AgentStatus.ONLINE.value,
+                "last_seen": received_at,
+                "ip_address": agent_data.ip_address,
+            }),
+            status_code=202,
+            media_type="application/json",
+        )
+    
     # Check if agent exists
     result = await db.execute(select(AgentDB).where(AgentDB.name == agent_data.name))
     existing_agent = result.scalar_one_or_none()
@@ -105,7 +178,8 @@ async def register_agent(agent_data: AgentRegister, db: AsyncSession = Depends(g
         existing_agent.last_seen = datetime.now()
         existing_agent.ip_address = agent_data.ip_address
         await db.commit()
-        await db.refresh(existing_agent)
+        heartbeat.remember_agent(existing_agent.name, existing_agent.id, agent_data, existing_agent.last_seen)
+        known_agents.add(existing_agent.id)
         
         return Agent(
             id=existing_agent.id,
@@ -130,7 +204,8 @@ async def register_agent(agent_data: AgentRegister, db: AsyncSession = Depends(g
         )
         db.add(agent_db)
         await db.commit()
-        await db.refresh(agent_db)
+        heartbeat.remember_agent(agent_db.name, agent_db.id, agent_data, agent_db.last_seen)
+        known_agents.add(agent_db.id)
         
         return Agent(
             id=agent_db.id,
@@ -150,7 +225,7 @@ async def update_agent(
     db: AsyncSession = Depends(get_db)
 ):
     """Update an agent"""
-    result = await db.execute(select(AgentDB).where(AgentDB.id == agent_id))
+    result = await db.execute(_select_agent_by_id, {"agent_id": agent_id})
     agent_db = result.scalar_one_or_none()
     
     if not agent_db:
@@ -159,6 +234,8 @@ async def update_agent(
     # Update name if provided
     if agent_data.name is not None:
         agent_db.name = agent_data.name
+        # Heartbeats under the old name no longer match this agent
+        heartbeat.forget_agent(agent_id)
     
     await db.commit()
     await db.refresh(agent_db)
@@ -172,7 +249,7 @@ async def update_agent(
         platform=agent_db.platform,
         version=agent_db.version,
         status=AgentStatus(current_status.value),
-        last_seen=agent_db.last_seen,
+        last_seen=_last_seen(agent_db),
         ip_address=agent_db.ip_address,
     )
 
@@ -180,7 +257,7 @@ async def update_agent(
 @router.delete("/{agent_id}")
 async def delete_agent(agent_id: str, db: AsyncSession = Depends(get_db)):
     """Unregister agent"""
-    result = await db.execute(select(AgentDB).where(AgentDB.id == agent_id))
+    result = await db.execute(_select_agent_by_id, {"agent_id": agent_id})
     agent_db = result.scalar_one_or_none()
     
     if not agent_db:
@@ -189,5 +266,7 @@ async def delete_agent(agent_id: str, db: AsyncSession = Depends(get_db)):
     # Use delete statement for SQLAlchemy 2.0 async
     await db.execute(delete(AgentDB).where(AgentDB.id == agent_id))
     await db.commit()
+    heartbeat.forget_agent(agent_id)
+    known_agents.discard(agent_id)
     return {"message": "Agent deleted"}
 
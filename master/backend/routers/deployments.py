@@ -2,91 +2,195 @@
 Deployment Management Routes
 """
 
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query, Response
+from pydantic import BaseModel, TypeAdapter
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, desc, asc
-from sqlalchemy.orm import selectinload
-from typing import List, Optional
+from sqlalchemy import select, insert, update, desc, asc, func, tuple_
+from typing import List, Optional, Tuple
 from datetime import datetime
+import secrets
+import time
 
-from database import get_db
+import known_agents
+import pending_deployments
+from database import AsyncSessionLocal, get_db
 from db_models import AgentDB, ReleaseDB, DeploymentDB, DeploymentStatusEnum
-from models import Deployment, DeploymentCreate, DeploymentComplete, DeploymentStatus
+from models import Deployment, DeploymentPage, DeploymentCreate, DeploymentComplete, DeploymentStatus
 
 router = APIRouter(prefix="/api/deployments", tags=["deployments"])
 
+# Upper bound for a list page, so one request cannot load the whole table
+MAX_PAGE_SIZE = 500
 
-@router.get("", response_model=List[Deployment])
-async def get_deployments(
-    agent_id: Optional[str] = None,
-    status: Optional[DeploymentStatus] = None,
-    db: AsyncSession = Depends(get_db)
-):
+# Validates a whole page of row tuples in one pydantic-core call
+_DEPLOYMENT_LIST_ADAPTER = TypeAdapter(List[Deployment])
+
+# Timestamp used by the last generated deployment ID (keeps IDs strictly increasing)
+_last_id_ns = 0
+
+
+def _new_deployment_id(agent_id: str) -> str:
     """
-    List all deployments with optional filtering
-    - agent_id: Filter by agent ID
-    - status: Filter by deployment status (pending, in_progress, success, failed)
+    Generate a unique deployment ID for an agent
+    Nanosecond timestamp (fixed-width hex, sorts by creation time) plus a random
+    suffix, so deployments created for the same agent in one second never collide
+    The timestamp is bumped past the previous one when the clock has not advanced
+    (coarse clocks, e.g. ~15 ms on Windows), so IDs stay monotonic like a ULID
     """
-    query = select(DeploymentDB)
-    
-    # Apply filters
+    global _last_id_ns
+    _last_id_ns = max(time.time_ns(), _last_id_ns + 1)
+    return f"deploy-{agent_id}-{_last_id_ns:016x}-{secrets.token_hex(4)}"
+
+
+def _select_deployment_rows():
+    """
+    SELECT of just the columns a Deployment response needs, agent name joined in
+    Rows are plain tuples (no DeploymentDB/AgentDB instances are hydrated)
+    """
+    return select(
+        DeploymentDB.id,
+        DeploymentDB.agent_id,
+        func.coalesce(AgentDB.name, "Unknown").label("agent_name"),
+        DeploymentDB.release_ids,
+        DeploymentDB.release_tags,
+        DeploymentDB.status,
+        DeploymentDB.created_at,
+        DeploymentDB.started_at,
+        DeploymentDB.completed_at,
+        DeploymentDB.error_message,
+    ).join(AgentDB, DeploymentDB.agent_id == AgentDB.id, isouter=True)
+
+
+def _filter_deployment_rows(agent_id: Optional[str], statuses: Optional[List[DeploymentStatus]]):
+    """
+    Deployment-row SELECT with the list endpoint's optional agent/status filters
+    Several statuses become one IN (...) predicate; a single status stays an equality,
+    which lets the (agent_id, status, created_at) index return rows already ordered
+    """
+    query = _select_deployment_rows()
     if agent_id:
         query = query.where(DeploymentDB.agent_id == agent_id)
+    if statuses:
+        codes = {DeploymentStatusEnum(status.value) for status in statuses}
+        if len(codes) == 1:
+            query = query.where(DeploymentDB.status == codes.pop())
+        else:
+            query = query.where(DeploymentDB.status.in_(codes))
+    return query
+
+
+def _json_response(model: BaseModel) -> Response:
+    """
+    Serialize a response model with pydantic-core's JSON encoder
+    Returning a Response directly skips FastAPI's re-validation against
+    response_model and its jsonable_encoder pass (the model is already validated)
+    Kept over the app's ORJSONResponse default for models: orjson would first need a
+    model_dump() into dicts, about twice the cost for a 500-row page
+    """
+    return Response(content=model.model_dump_json(), media_type="application/json")
+
+
+async def _deployment_page(
+    db: AsyncSession, query, limit: int, offset: int, before: Optional[Tuple[datetime, str]] = None
+) -> Response:
+    """
+    Run a deployment-row query for one page, newest first (ties broken by ID)
+    The total match count rides along as an uncorrelated scalar subquery (run once,
+    on deployments alone); unlike a COUNT(*) OVER () window it does not materialize
+    every match, so the page can be read in index order with no sort step
+    Only a page past the end needs a separate COUNT
+    `before` is a keyset cursor, the (created_at, id) of the last row already seen:
+    the page starts right after it; total still counts every match of the filters
+    The cursor is an index seek only where an index ends in created_at after the
+    equality filters: an agent filter (idx_deployment_agent_created /
+    idx_deployment_agent_status_created), or no filter on PostgreSQL
+    (idx_deployment_created_desc). SQLite has no standalone created_at index, so an
+    unfiltered or status-only page there scans and sorts the matches either way
+    """
+    count_query = select(func.count()).select_from(DeploymentDB)
+    if query.whereclause is not None:
+        count_query = count_query.where(query.whereclause)
     
-    if status:
-        query = query.where(DeploymentDB.status == DeploymentStatusEnum(status.value))
+    if before is not None:
+        query = query.where(tuple_(DeploymentDB.created_at, DeploymentDB.id) < tuple_(*before))
     
-    # Order by created_at descending (newest first)
-    query = query.order_by(desc(DeploymentDB.created_at))
+    result = await db.execute(
+        query.add_columns(count_query.scalar_subquery().label("total"))
+        .order_by(desc(DeploymentDB.created_at), desc(DeploymentDB.id))
+        .limit(limit)
+        .offset(offset)
+    )
+    rows = result.all()
     
-    # Join with Agent to get current agent name
-    query = query.options(selectinload(DeploymentDB.agent))
-    result = await db.execute(query)
-    deployments_db = result.scalars().all()
+    if rows:
+        total = rows[0].total
+    else:
+        total = await db.scalar(count_query)
     
-    return [
-        Deployment(
-            id=deployment.id,
-            agent_id=deployment.agent_id,
-            agent_name=deployment.agent.name if deployment.agent else "Unknown",
-            release_ids=deployment.release_ids or [],
-            release_tags=deployment.release_tags or [],
-            status=DeploymentStatus(deployment.status.value),
-            created_at=deployment.created_at,
-            started_at=deployment.started_at,
-            completed_at=deployment.completed_at,
-            error_message=deployment.error_message,
-        )
-        for deployment in deployments_db
-    ]
+    return _json_response(DeploymentPage(
+        items=_DEPLOYMENT_LIST_ADAPTER.validate_python(rows, from_attributes=True),
+        total=total,
+        limit=limit,
+        offset=offset,
+    ))
 
 
-@router.get("/history", response_model=List[Deployment])
-async def get_deployment_history(limit: int = 50, db: AsyncSession = Depends(get_db)):
-    """Get deployment history"""
-    result = await db.execute(
-        select(DeploymentDB)
-        .options(selectinload(DeploymentDB.agent))
-        .order_by(desc(DeploymentDB.created_at))
-        .limit(limit)
-    )
-    deployments_db = result.scalars().all()
+async def warm_query_cache(session_factory=AsyncSessionLocal):
+    """
+    Run each list-query filter shape once, so their compiled SQL is in the engine's
+    statement cache before the first request (call on application startup)
+    Filter values are bound parameters (IN lists expand at execution), so one run
+    covers every agent and status
+    """
+    status_filters = (None, [DeploymentStatus.PENDING], [DeploymentStatus.SUCCESS, DeploymentStatus.FAILED])
+    async with session_factory() as session:
+        for agent_id in (None, "warm-up"):
+            for statuses in status_filters:
+                await _deployment_page(session, _filter_deployment_rows(agent_id, statuses), 1, 0)
+
+
+def _uses_selected_versions(deployment_data: DeploymentCreate) -> bool:
+    """Check if the request provides a version tag for every release"""
+    return bool(deployment_data.release_versions) and \
+        len(deployment_data.release_versions) == len(deployment_data.release_ids)
+
+
+@router.get("", response_model=DeploymentPage)
+async def get_deployments(
+    agent_id: Optional[str] = None,
+    status: Optional[List[DeploymentStatus]] = Query(None),
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+    offset: int = Query(0, ge=0),
+    before_created_at: Optional[datetime] = None,
+    before_id: Optional[str] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    List deployments with optional filtering, newest first, one page at a time
+    - agent_id: Filter by agent ID
+    - status: Filter by deployment status (pending, in_progress, success, failed);
+      repeat it to match any of several (?status=success&status=failed)
+    - limit/offset: Page size (at most MAX_PAGE_SIZE) and number of rows to skip
+    - before_created_at/before_id: Keyset cursor, the created_at and id of the last
+      deployment of the previous page; the next page starts after it (use instead of
+      offset for deep pages: stable under inserts, and an index seek when filtering
+      by agent)
+    """
+    if (before_created_at is None) != (before_id is None):
+        raise HTTPException(status_code=400, detail="before_created_at and before_id must be given together")
+    before = (before_created_at, before_id) if before_id is not None else None
     
-    return [
-        Deployment(
-            id=deployment.id,
-            agent_id=deployment.agent_id,
-            agent_name=deployment.agent.name if deployment.agent else "Unknown",
-            release_ids=deployment.release_ids or [],
-            release_tags=deployment.release_tags or [],
-            status=DeploymentStatus(deployment.status.value),
-            created_at=deployment.created_at,
-            started_at=deployment.started_at,
-            completed_at=deployment.completed_at,
-            error_message=deployment.error_message,
-        )
-        for deployment in deployments_db
-    ]
+    return await _deployment_page(db, _filter_deployment_rows(agent_id, status), limit, offset, before)
+
+
+@router.get("/history", response_model=DeploymentPage)
+async def get_deployment_history(
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+    offset: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get deployment history (newest first, at most MAX_PAGE_SIZE entries per page)"""
+    return await _deployment_page(db, _select_deployment_rows(), limit, offset)
 
 
 @router.get("/pending/{agent_id}", response_model=Optional[Deployment])
@@ -96,99 +200,103 @@ async def get_pending_deployment(agent_id: str, db: AsyncSession = Depends(get_d
     Returns the oldest PENDING deployment for the agent, or None if no pending deployment exists
     """
     # Verify agent exists
-    result = await db.execute(select(AgentDB).where(AgentDB.id == agent_id))
-    agent_db = result.scalar_one_or_none()
-    
-    if not agent_db:
+    if not await known_agents.exists(db, agent_id):
         raise HTTPException(status_code=404, detail="Agent not found")
     
-    # Get oldest PENDING deployment for this agent
-    result = await db.execute(
-        select(DeploymentDB)
-        .options(selectinload(DeploymentDB.agent))
-        .where(DeploymentDB.agent_id == agent_id)
-        .where(DeploymentDB.status == DeploymentStatusEnum.PENDING)
-        .order_by(asc(DeploymentDB.created_at))
-        .limit(1)
-    )
-    deployment_db = result.scalar_one_or_none()
+    # Steady state: no work queued for this agent, answer without a query
+    if not pending_deployments.has_pending(agent_id):
+        return None
     
-    if not deployment_db:
+    # Cleared before the query so a deployment created while it runs re-adds the agent
+    pending_deployments.discard(agent_id)
+    try:
+        # Claim the oldest PENDING deployment in one statement: UPDATE ... RETURNING,
+        # with the row picked by a subquery (FOR UPDATE SKIP LOCKED on PostgreSQL, so
+        # concurrent polls never claim the same row)
+        oldest_pending_id = (
+            select(DeploymentDB.id)
+            .where(DeploymentDB.agent_id == agent_id)
+            .where(DeploymentDB.status == DeploymentStatusEnum.PENDING)
+            .order_by(asc(DeploymentDB.created_at))
+            .limit(1)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        agent_name = select(AgentDB.name).where(AgentDB.id == DeploymentDB.agent_id).scalar_subquery()
+        result = await db.execute(
+            update(DeploymentDB)
+            .where(DeploymentDB.id == oldest_pending_id)
+            .where(DeploymentDB.status == DeploymentStatusEnum.PENDING)
+            .values(status=DeploymentStatusEnum.IN_PROGRESS, started_at=datetime.now())
+            .returning(
+                DeploymentDB.id,
+                DeploymentDB.agent_id,
+                func.coalesce(agent_name, "Unknown").label("agent_name"),
+                DeploymentDB.release_ids,
+                DeploymentDB.release_tags,
+                DeploymentDB.status,
+                DeploymentDB.created_at,
+                DeploymentDB.started_at,
+                DeploymentDB.completed_at,
+                DeploymentDB.error_message,
+            )
+        )
+        claimed = result.first()
+        await db.commit()
+    except Exception:
+        pending_deployments.add(agent_id)
+        raise
+    
+    if claimed is None:
         return None
     
-    # Update status to IN_PROGRESS and set started_at
-    deployment_db.status = DeploymentStatusEnum.IN_PROGRESS
-    deployment_db.started_at = datetime.now()
-    await db.commit()
-    await db.refresh(deployment_db)
+    # The agent may have more queued work; the next poll checks (and clears the flag if not)
+    pending_deployments.add(agent_id)
     
-    return Deployment(
-        id=deployment_db.id,
-        agent_id=deployment_db.agent_id,
-        agent_name=deployment_db.agent.name if deployment_db.agent else "Unknown",
-        release_ids=deployment_db.release_ids or [],
-        release_tags=deployment_db.release_tags or [],
-        status=DeploymentStatus(deployment_db.status.value),
-        created_at=deployment_db.created_at,
-        started_at=deployment_db.started_at,
-        completed_at=deployment_db.completed_at,
-        error_message=deployment_db.error_message,
-    )
+    return _json_response(Deployment.model_validate(claimed))
 
 
 @router.get("/{deployment_id}", response_model=Deployment)
 async def get_deployment(deployment_id: str, db: AsyncSession = Depends(get_db)):
     """Get specific deployment"""
-    result = await db.execute(
-        select(DeploymentDB)
-        .options(selectinload(DeploymentDB.agent))
-        .where(DeploymentDB.id == deployment_id)
-    )
-    deployment_db = result.scalar_one_or_none()
+    result = await db.execute(_select_deployment_rows().where(DeploymentDB.id == deployment_id))
+    row = result.first()
     
-    if not deployment_db:
+    if not row:
         raise HTTPException(status_code=404, detail="Deployment not found")
     
-    return Deployment(
-        id=deployment_db.id,
-        agent_id=deployment_db.agent_id,
-        agent_name=deployment_db.agent.name if deployment_db.agent else "Unknown",
-        release_ids=deployment_db.release_ids or [],
-        release_tags=deployment_db.release_tags or [],
-        status=DeploymentStatus(deployment_db.status.value),
-        created_at=deployment_db.created_at,
-        started_at=deployment_db.started_at,
-        completed_at=deployment_db.completed_at,
-        error_message=deployment_db.error_message,
-    )
+    return Deployment.model_validate(row)
 
 
 @router.post("", response_model=Deployment)
 async def create_deployment(deployment_data: DeploymentCreate, db: AsyncSession = Depends(get_db)):
     """Create a deployment (can deploy multiple releases to an agent at once)"""
     # Validate agent exists
-    result = await db.execute(select(AgentDB).where(AgentDB.id == deployment_data.agent_id))
-    agent_db = result.scalar_one_or_none()
-    
-    if not agent_db:
+    if not await known_agents.exists(db, deployment_data.agent_id):
         raise HTTPException(status_code=404, detail="Agent not found")
     
     # Validate all releases exist and use selected versions if provided
     release_tags = []
-    if deployment_data.release_versions and len(deployment_data.release_versions) == len(deployment_data.release_ids):
+    if _uses_selected_versions(deployment_data):
         # Use provided version tags
         release_tags = deployment_data.release_versions
     else:
         # Fallback to release tag_name if versions not provided
-        for release_id in deployment_data.release_ids:
-            result = await db.execute(select(ReleaseDB).where(ReleaseDB.id == release_id))
-            release_db = result.scalar_one_or_none()
-            if not release_db:
-                raise HTTPException(status_code=404, detail=f"Release {release_id} not found")
-            release_tags.append(release_db.tag_name)
+        # One IN query for all releases (each ID bound once, even if repeated in the request)
+        release_ids = set(deployment_data.release_ids)
+        result = await db.execute(
+            select(ReleaseDB.id, ReleaseDB.tag_name).where(ReleaseDB.id.in_(release_ids))
+        )
+        tags_by_release_id = dict(result.all())
+        
+        # Report every missing release at once instead of only the first
+        missing_releases = release_ids - tags_by_release_id.keys()
+        if missing_releases:
+            raise HTTPException(status_code=404, detail=f"Releases not found: {', '.join(sorted(missing_releases))}")
+        release_tags = [tags_by_release_id[release_id] for release_id in deployment_data.release_ids]
     
     # Create deployment
-    deployment_id = f"deploy-{agent_db.id}-{datetime.now().strftime('%Y%m%d%H%M%S')}"
+    deployment_id = _new_deployment_id(deployment_data.agent_id)
     
     deployment_db = DeploymentDB(
         id=deployment_id,
@@ -201,10 +309,11 @@ async def create_deployment(deployment_data: DeploymentCreate, db: AsyncSession
     
     db.add(deployment_db)
     await db.commit()
-    await db.refresh(deployment_db)
+    pending_deployments.add(deployment_data.agent_id)
     
-    # Load agent relationship for response
-    await db.refresh(deployment_db, ['agent'])
+    # Every response field was set above (the session does not expire on commit);
+    # only the agent name is read back, instead of refreshing the row and its agent
+    agent_name = await db.scalar(select(AgentDB.name).where(AgentDB.id == deployment_data.agent_id))
     
     # Deployment is created in PENDING state
     # Agent will poll /api/deployments/pending/{agent_id} to retrieve and execute it
@@ -212,17 +321,91 @@ async def create_deployment(deployment_data: DeploymentCreate, db: AsyncSession
     return Deployment(
         id=deployment_db.id,
         agent_id=deployment_db.agent_id,
-        agent_name=deployment_db.agent.name if deployment_db.agent else "Unknown",
-        release_ids=deployment_db.release_ids or [],
-        release_tags=deployment_db.release_tags or [],
-        status=DeploymentStatus(deployment_db.status.value),
+        agent_name=agent_name or "Unknown",
+        release_ids=deployment_db.release_ids,
+        release_tags=deployment_db.release_tags,
+        status=DeploymentStatus.PENDING,
         created_at=deployment_db.created_at,
-        started_at=deployment_db.started_at,
-        completed_at=deployment_db.completed_at,
-        error_message=deployment_db.error_message,
     )
 
 
+@router.post("/bulk", response_model=List[Deployment])
+async def create_deployments_bulk(
+    deployments_data: List[DeploymentCreate],
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Create multiple deployments at once (e.g. fleet-wide rollout, one per agent)
+    Agents and releases are validated with one query each and all deployments
+    are written with a single multi-row INSERT in one transaction
+    """
+    if not deployments_data:
+        return []
+    
+    # Validate all agents exist
+    agent_ids = {deployment_data.agent_id for deployment_data in deployments_data}
+    result = await db.execute(select(AgentDB.id, AgentDB.name).where(AgentDB.id.in_(agent_ids)))
+    agent_names = dict(result.all())
+    
+    missing_agents = agent_ids - agent_names.keys()
+    if missing_agents:
+        raise HTTPException(status_code=404, detail=f"Agents not found: {', '.join(sorted(missing_agents))}")
+    
+    # Release tag names are only needed for deployments without selected versions
+    release_ids = {
+        release_id
+        for deployment_data in deployments_data
+        if not _uses_selected_versions(deployment_data)
+        for release_id in deployment_data.release_ids
+    }
+    tags_by_release_id = {}
+    if release_ids:
+        result = await db.execute(
+            select(ReleaseDB.id, ReleaseDB.tag_name).where(ReleaseDB.id.in_(release_ids))
+        )
+        tags_by_release_id = dict(result.all())
+        
+        missing_releases = release_ids - tags_by_release_id.keys()
+        if missing_releases:
+            raise HTTPException(status_code=404, detail=f"Releases not found: {', '.join(sorted(missing_releases))}")
+    
+    # Build all rows, deployment IDs are generated here so no RETURNING is needed
+    created_at = datetime.now()
+    rows = []
+    for deployment_data in deployments_data:
+        if _uses_selected_versions(deployment_data):
+            release_tags = deployment_data.release_versions
+        else:
+            release_tags = [tags_by_release_id[release_id] for release_id in deployment_data.release_ids]
+        
+        rows.append({
+            "id": _new_deployment_id(deployment_data.agent_id),
+            "agent_id": deployment_data.agent_id,
+            "release_ids": deployment_data.release_ids,
+            "release_tags": release_tags,
+            "status": DeploymentStatusEnum.PENDING,
+            "created_at": created_at,
+        })
+    
+    await db.execute(insert(DeploymentDB), rows)
+    await db.commit()
+    for agent_id in agent_ids:
+        pending_deployments.add(agent_id)
+    
+    return [
+        Deployment(
+            id=row["id"],
+            agent_id=row["agent_id"],
+            agent_name=agent_names[row["agent_id"]],
+            release_ids=row["release_ids"],
+            release_tags=row["release_tags"],
+            status=DeploymentStatus.PENDING,
+            created_at=row["created_at"],
+        )
+        for row in rows
+    ]
+
+
 @router.post("/{deployment_id}/complete")
 async def complete_deployment(
     deployment_id: str,
@@ -233,8 +416,7 @@ async def complete_deployment(
     Report deployment completion (Agent reports deployment result)
     """
     # Get deployment
-    result = await db.execute(select(DeploymentDB).where(DeploymentDB.id == deployment_id))
-    deployment_db = result.scalar_one_or_none()
+    deployment_db = await db.get(DeploymentDB, deployment_id)
     
     if not deployment_db:
         raise HTTPException(status_code=404, detail="Deployment not found")
@@ -253,7 +435,6 @@ async def complete_deployment(
         deployment_db.error_message = completion_data.error_message
     
     await db.commit()
-    await db.refresh(deployment_db)
     
     return {
         "message": "Deployment status updated",
@@ -5,11 +5,12 @@ Health Check and Monitoring Routes
 from fastapi import APIRouter, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
+from sqlalchemy.pool import QueuePool
 from datetime import datetime
 
-from database import get_db, engine, IS_SQLITE
+from database import get_db, engine
 from db_models import AgentDB, ReleaseDB, DeploymentDB
-from monitoring import get_metrics_summary, get_pending_deployment_metrics
+from monitoring import get_metrics_summary, get_pending_deployment_metrics, reset_metrics
 
 router = APIRouter(tags=["health"])
 
@@ -22,23 +23,24 @@ async def health_check(db: AsyncSession = Depends(get_db)):
     releases_count = await db.scalar(select(func.count(ReleaseDB.id)))
     deployments_count = await db.scalar(select(func.count(DeploymentDB.id)))
     
-    # Get database connection pool stats (only for PostgreSQL, SQLite doesn't use pooling)
-    if IS_SQLITE:
+    # Connection pool stats: PostgreSQL and file-backed SQLite both use a QueuePool;
+    # in-memory SQLite keeps one shared connection, and NullPool keeps none
+    pool = engine.pool
+    if isinstance(pool, QueuePool):
         pool_stats = {
-            "note": "SQLite does not use connection pooling",
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": pool.overflow(),
+        }
+    else:
+        pool_stats = {
+            "note": f"{type(pool).__name__} keeps no connection pool statistics",
             "size": None,
             "checked_in": None,
             "checked_out": None,
             "overflow": None,
         }
-    else:
-        pool = engine.pool
-        pool_stats = {
-            "size": pool.size() if hasattr(pool, 'size') else None,
-            "checked_in": pool.checkedin() if hasattr(pool, 'checkedin') else None,
-            "checked_out": pool.checkedout() if hasattr(pool, 'checkedout') else None,
-            "overflow": pool.overflow() if hasattr(pool, 'overflow') else None,
-        }
     
     return {
         "status": "healthy",
@@ -61,3 +63,9 @@ async def get_pending_deployment_metrics_endpoint():
     """Get specific metrics for pending deployment endpoint"""
     return get_pending_deployment_metrics()
 
+
+@router.post("/api/metrics/reset")
+async def reset_metrics_endpoint():
+    """Clear collected API metrics and restart the uptime clock (e.g. after a load test)"""
+    reset_metrics()
+    return {"message": "Metrics reset"}
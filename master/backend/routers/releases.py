@@ -2,64 +2,167 @@
 Release Management Routes
 """
 
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, Body, HTTPException, Depends, Query
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from typing import List, Optional
-from sqlalchemy import select, delete
-from typing import List
+from sqlalchemy import select, update, delete
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime
+import asyncio
 import re
 import httpx
-from pydantic import BaseModel
+import orjson
+from pydantic import AliasChoices, BaseModel, Field, TypeAdapter
 
-from database import get_db
-from db_models import ReleaseDB, SettingsDB
-from models import Release, ReleaseCreate, ReleaseUpdate
+import github_api
+import github_token
+from database import get_db, dialect_insert
+from db_models import ReleaseDB
+from models import Release, ReleaseCreate, ReleaseSummary, ReleaseUpdate
 
 router = APIRouter(prefix="/api/releases", tags=["releases"])
 
+# Release IDs accepted by one /versions:batch request, and GitHub calls it runs at once
+MAX_BATCH_RELEASES = 50
+GITHUB_MAX_CONCURRENT_REQUESTS = 8
+
+# Release IDs accepted by one :mget request (one IN query, well under SQLite's bind limit)
+MAX_MGET_RELEASES = 500
+
+# Bytes of a failed GitHub response body echoed in the error detail
+GITHUB_ERROR_DETAIL_BYTES = 200
+
+# Owner and repository from a GitHub URL (prefix match: /releases etc. may follow)
+_GITHUB_URL_RE = re.compile(r'https://github\.com/([^/]+)/([^/]+)')
+
+# Serialized release list, rebuilt on the first read after any release mutation
+_releases_payload: Optional[List[dict]] = None
+# Bumped by every invalidation; a read only caches what it built if no mutation
+# happened while it was awaiting the query
+_releases_generation: int = 0
+
+
+def _invalidate_releases_cache():
+    """Drop the cached release list (call after every release mutation)"""
+    global _releases_payload, _releases_generation
+    _releases_payload = None
+    _releases_generation += 1
+
+
+class GitHubReleaseVersion(BaseModel):
+    """GitHub release version information"""
+    tag_name: str = ""
+    # GitHub releases without a title fall back to their tag
+    name: str = Field("", validation_alias=AliasChoices("name", "tag_name"))
+    published_at: str = ""
+    html_url: str = ""
+    assets: List[dict] = []
+
+
+# Whole-list validators: one call into pydantic-core per list instead of one per row
+_RELEASE_LIST_ADAPTER = TypeAdapter(List[Release])
+_RELEASE_SUMMARY_LIST_ADAPTER = TypeAdapter(List[ReleaseSummary])
+_VERSION_LIST_ADAPTER = TypeAdapter(List[GitHubReleaseVersion])
+
 
 @router.get("", response_model=List[Release])
 async def get_releases(db: AsyncSession = Depends(get_db)):
     """List all releases"""
-    result = await db.execute(select(ReleaseDB))
-    releases_db = result.scalars().all()
+    global _releases_payload
+    payload = _releases_payload
+    if payload is None:
+        generation = _releases_generation
+        result = await db.execute(select(ReleaseDB))
+        releases_db = result.scalars().all()
+        
+        payload = _RELEASE_LIST_ADAPTER.dump_python(
+            _RELEASE_LIST_ADAPTER.validate_python(releases_db, from_attributes=True), mode="json"
+        )
+        # A create/update/delete during the await may have made this list stale:
+        # serve it to this request, but don't cache it
+        if generation == _releases_generation:
+            _releases_payload = payload
     
-    return [
-        Release(
-            id=release.id,
-            tag_name=release.tag_name,
-            name=release.name,
-            version=release.version or "",
-            release_date=release.release_date,
-            download_url=release.download_url,
-            description=release.description,
-            assets=release.assets or [],
+    # Returning a response directly skips re-validation against response_model
+    return ORJSONResponse(payload)
+
+
+@router.get(":summary", response_model=List[ReleaseSummary])
+async def get_release_summaries(db: AsyncSession = Depends(get_db)):
+    """
+    List all releases without description and assets
+    Selects only the summary columns, so the assets JSON is never read or decoded
+    """
+    result = await db.execute(
+        select(
+            ReleaseDB.id,
+            ReleaseDB.tag_name,
+            ReleaseDB.name,
+            ReleaseDB.version,
+            ReleaseDB.release_date,
+            ReleaseDB.download_url,
         )
-        for release in releases_db
-    ]
+    )
+    return _RELEASE_SUMMARY_LIST_ADAPTER.validate_python(result.all(), from_attributes=True)
+
+
+@router.post(":mget", response_model=List[Release])
+async def mget_releases(
+    ids: List[str] = Body(..., max_length=MAX_MGET_RELEASES),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get several releases in one request (body: JSON list of release IDs)
+    Preferred over one GET /api/releases/{release_id} per release on multi-release
+    screens: a single IN query instead of N. Unknown IDs are left out of the result
+    """
+    result = await db.execute(select(ReleaseDB).where(ReleaseDB.id.in_(set(ids))))
+    return _RELEASE_LIST_ADAPTER.validate_python(result.scalars().all(), from_attributes=True)
+
+
+@router.get("/versions:batch", response_model=Dict[str, List[GitHubReleaseVersion]])
+async def get_release_versions_batch(
+    ids: List[str] = Query(..., max_length=MAX_BATCH_RELEASES),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get available versions for several releases at once (release ID -> versions)
+    GitHub is queried concurrently, at most GITHUB_MAX_CONCURRENT_REQUESTS at a time
+    """
+    release_ids = set(ids)
+    result = await db.execute(select(ReleaseDB).where(ReleaseDB.id.in_(release_ids)))
+    releases_db = result.scalars().all()
+    
+    missing_releases = release_ids - {release.id for release in releases_db}
+    if missing_releases:
+        raise HTTPException(status_code=404, detail=f"Releases not found: {', '.join(sorted(missing_releases))}")
+    
+    # Reject invalid GitHub URLs before any request is sent
+    for release in releases_db:
+        _github_repo(release)
+    headers = await _github_headers(db)
+    semaphore = asyncio.Semaphore(GITHUB_MAX_CONCURRENT_REQUESTS)
+    
+    async def fetch(release_db: ReleaseDB) -> List[dict]:
+        async with semaphore:
+            return await _release_versions(release_db, headers)
+    
+    versions = await asyncio.gather(*(fetch(release) for release in releases_db))
+    await db.commit()
+    
+    # Versions are already validated dicts; returning a response directly skips re-validation
+    return ORJSONResponse({release.id: release_versions for release, release_versions in zip(releases_db, versions)})
 
 
 @router.get("/{release_id}", response_model=Release)
 async def get_release(release_id: str, db: AsyncSession = Depends(get_db)):
     """Get specific release"""
-    result = await db.execute(select(ReleaseDB).where(ReleaseDB.id == release_id))
-    release_db = result.scalar_one_or_none()
+    release_db = await db.get(ReleaseDB, release_id)
     
     if not release_db:
         raise HTTPException(status_code=404, detail="Release not found")
     
-    return Release(
-        id=release_db.id,
-        tag_name=release_db.tag_name,
-        name=release_db.name,
-        version=release_db.version or "",
-        release_date=release_db.release_date,
-        download_url=release_db.download_url,
-        description=release_db.description,
-        assets=release_db.assets or [],
-    )
+    return Release.model_validate(release_db)
 
 
 @router.post("", response_model=Release)
@@ -68,8 +171,7 @@ async def create_release(release_data: ReleaseCreate, db: AsyncSession = Depends
     # Extract owner and repo from GitHub URL
     # Example: https://github.com/jameskwon07/3project/releases/
     github_url = release_data.github_url.rstrip('/')
-    pattern = r'https://github\.com/([^/]+)/([^/]+)'
-    match = re.match(pattern, github_url)
+    match = _GITHUB_URL_RE.match(github_url)
     
     if not match:
         raise HTTPException(status_code=400, detail="Invalid GitHub URL format")
@@ -80,40 +182,36 @@ async def create_release(release_data: ReleaseCreate, db: AsyncSession = Depends
     release_id = repo
     release_name = repo
     
-    # Check if release already exists
-    result = await db.execute(select(ReleaseDB).where(ReleaseDB.id == release_id))
-    existing_release = result.scalar_one_or_none()
-    
-    if existing_release:
-        raise HTTPException(status_code=400, detail=f"Release for repository '{repo}' already exists")
-    
     # TODO: Fetch actual releases from GitHub API using github_token
     # For now, create a placeholder release that will be populated when versions are fetched
-    release_db = ReleaseDB(
+    release = Release(
         id=release_id,
         tag_name=repo,  # Use repo name as tag_name
         name=release_name,
         version="",  # Will be populated when fetching versions
+        # Naive local time like every other timestamp column (no UTC/epoch storage):
+        # release_date is a naive DateTime the frontend parses with new Date(), and
+        # existing rows are naive local values
         release_date=datetime.now(),
         description=f"GitHub: {owner}/{repo}",
         download_url=github_url,
         assets=[],  # Will be populated when fetching versions
     )
     
-    db.add(release_db)
-    await db.commit()
-    await db.refresh(release_db)
-    
-    return Release(
-        id=release_db.id,
-        tag_name=release_db.tag_name,
-        name=release_db.name,
-        version=release_db.version or "",
-        release_date=release_db.release_date,
-        download_url=release_db.download_url,
-        description=release_db.description,
-        assets=release_db.assets or [],
+    # One statement: the primary-key conflict replaces the existence SELECT
+    result = await db.execute(
+        dialect_insert(ReleaseDB)
+        .values(**release.model_dump())
+        .on_conflict_do_nothing(index_elements=[ReleaseDB.id])
+        .returning(ReleaseDB.id)
     )
+    if result.scalar_one_or_none() is None:
+        raise HTTPException(status_code=400, detail=f"Release for repository '{repo}' already exists")
+    
+    await db.commit()
+    _invalidate_releases_cache()
+    
+    return release
 
 
 @router.put("/{release_id}", response_model=Release)
@@ -123,129 +221,132 @@ async def update_release(
     db: AsyncSession = Depends(get_db)
 ):
     """Update a release"""
-    result = await db.execute(select(ReleaseDB).where(ReleaseDB.id == release_id))
-    release_db = result.scalar_one_or_none()
+    # Fields provided in the request
+    changes = release_data.model_dump(exclude_none=True)
+    if "download_url" in changes:
+        # Cached GitHub versions belong to the old repository
+        changes.update(versions_etag=None, cached_versions=None)
+    
+    if changes:
+        # UPDATE ... RETURNING: no SELECT before the write, no refresh after it
+        release_db = await db.scalar(
+            update(ReleaseDB).where(ReleaseDB.id == release_id).values(**changes).returning(ReleaseDB)
+        )
+    else:
+        release_db = await db.get(ReleaseDB, release_id)
     
     if not release_db:
         raise HTTPException(status_code=404, detail="Release not found")
     
-    # Update fields if provided
-    if release_data.name is not None:
-        release_db.name = release_data.name
-    if release_data.description is not None:
-        release_db.description = release_data.description
-    if release_data.download_url is not None:
-        release_db.download_url = release_data.download_url
+    if changes:
+        await db.commit()
+        _invalidate_releases_cache()
     
-    await db.commit()
-    await db.refresh(release_db)
-    
-    return Release(
-        id=release_db.id,
-        tag_name=release_db.tag_name,
-        name=release_db.name,
-        version=release_db.version or "",
-        release_date=release_db.release_date,
-        download_url=release_db.download_url,
-        description=release_db.description,
-        assets=release_db.assets or [],
-    )
+    return Release.model_validate(release_db)
 
 
 @router.delete("/{release_id}")
 async def delete_release(release_id: str, db: AsyncSession = Depends(get_db)):
     """Delete/remove a release"""
-    result = await db.execute(select(ReleaseDB).where(ReleaseDB.id == release_id))
-    release_db = result.scalar_one_or_none()
+    # DELETE ... RETURNING reports whether the release existed (no SELECT first)
+    deleted_id = await db.scalar(delete(ReleaseDB).where(ReleaseDB.id == release_id).returning(ReleaseDB.id))
     
-    if not release_db:
+    if deleted_id is None:
         raise HTTPException(status_code=404, detail="Release not found")
     
-    # Use delete statement for SQLAlchemy 2.0 async
-    await db.execute(delete(ReleaseDB).where(ReleaseDB.id == release_id))
     await db.commit()
+    _invalidate_releases_cache()
     return {"message": "Release deleted"}
 
 
-class GitHubReleaseVersion(BaseModel):
-    """GitHub release version information"""
-    tag_name: str
-    name: str
-    published_at: str
-    html_url: str
-    assets: List[dict] = []
+def _github_repo(release_db: ReleaseDB) -> Tuple[str, str]:
+    """Owner and repository name from a release's GitHub URL"""
+    github_url = release_db.download_url.rstrip('/')
+    match = _GITHUB_URL_RE.match(github_url)
+    
+    if not match:
+        raise HTTPException(status_code=400, detail="Invalid GitHub URL format")
+    
+    return match.groups()
+
+
+async def _fetch_versions(
+    owner: str, repo: str, headers: Dict[str, str], etag: Optional[str] = None
+) -> Tuple[Optional[List[dict]], Optional[str]]:
+    """
+    Fetch a repository's releases from the GitHub API (shared client)
+    Returns the versions and the response's ETag; with `etag` the request is
+    conditional, and (None, etag) means GitHub answered 304 Not Modified
+    """
+    if etag:
+        headers = {**headers, "If-None-Match": etag}
+    
+    try:
+        response = await github_api.client().get(f"/repos/{owner}/{repo}/releases", headers=headers)
+        
+        if response.status_code == 304:
+            return None, etag
+        elif response.status_code == 404:
+            raise HTTPException(status_code=404, detail="GitHub repository not found")
+        elif response.status_code == 401:
+            raise HTTPException(status_code=401, detail="GitHub authentication failed. Please check your GitHub token.")
+        elif not response.is_success:
+            raise HTTPException(
+                status_code=response.status_code,
+                # Only the start of the body is decoded; GitHub error bodies are short JSON
+                detail=f"Failed to fetch GitHub releases: {response.content[:GITHUB_ERROR_DETAIL_BYTES].decode(errors='replace')}"
+            )
+        
+        # orjson parses the (asset-heavy) release list much faster than stdlib json
+        releases_data = orjson.loads(response.content)
+        
+        # Convert to response model (unknown GitHub fields are ignored)
+        versions = _VERSION_LIST_ADAPTER.dump_python(_VERSION_LIST_ADAPTER.validate_python(releases_data))
+        
+        return versions, response.headers.get("ETag")
+        
+    except httpx.TimeoutException:
+        raise HTTPException(status_code=504, detail="GitHub API request timeout")
+    except httpx.RequestError as e:
+        raise HTTPException(status_code=503, detail=f"Failed to connect to GitHub API: {str(e)}")
+
+
+async def _release_versions(release_db: ReleaseDB, headers: Dict[str, str]) -> List[dict]:
+    """
+    Versions of a release, revalidated against the copy cached on the release row
+    A 304 returns the cached list (no body transferred); a fresh list and its ETag
+    are set on the row, written when the caller commits (no database I/O here, so
+    several releases can be fetched concurrently on one session)
+    """
+    owner, repo = _github_repo(release_db)
+    etag = release_db.versions_etag if release_db.cached_versions is not None else None
+    
+    versions, new_etag = await _fetch_versions(owner, repo, headers, etag)
+    if versions is None:
+        return release_db.cached_versions
+    
+    release_db.versions_etag = new_etag
+    release_db.cached_versions = versions
+    return versions
 
 
-async def get_github_token_from_db(db: AsyncSession) -> Optional[str]:
-    """Get GitHub token from database"""
-    result = await db.execute(select(SettingsDB).where(SettingsDB.key == "github_token"))
-    settings_db = result.scalar_one_or_none()
-    return settings_db.value if settings_db and settings_db.value else None
+async def _github_headers(db: AsyncSession) -> Dict[str, str]:
+    """Request headers for the GitHub API (token auth when a token is set)"""
+    token = await github_token.get(db)
+    return {"Authorization": f"token {token}"} if token else {}
 
 
 @router.get("/{release_id}/versions", response_model=List[GitHubReleaseVersion])
 async def get_release_versions(release_id: str, db: AsyncSession = Depends(get_db)):
     """Get available versions from GitHub releases for a specific release"""
     # Get release from database
-    result = await db.execute(select(ReleaseDB).where(ReleaseDB.id == release_id))
-    release_db = result.scalar_one_or_none()
+    release_db = await db.get(ReleaseDB, release_id)
     
     if not release_db:
         raise HTTPException(status_code=404, detail="Release not found")
     
-    # Extract owner and repo from GitHub URL
-    github_url = release_db.download_url.rstrip('/')
-    pattern = r'https://github\.com/([^/]+)/([^/]+)'
-    match = re.match(pattern, github_url)
-    
-    if not match:
-        raise HTTPException(status_code=400, detail="Invalid GitHub URL format")
-    
-    owner, repo = match.groups()
-    
-    # Get GitHub token
-    github_token = await get_github_token_from_db(db)
-    
-    # Fetch releases from GitHub API
-    headers = {}
-    if github_token:
-        headers["Authorization"] = f"token {github_token}"
+    versions = await _release_versions(release_db, await _github_headers(db))
+    await db.commit()
     
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get(
-                f"https://api.github.com/repos/{owner}/{repo}/releases",
-                headers=headers,
-                timeout=10.0
-            )
-            
-            if response.status_code == 404:
-                raise HTTPException(status_code=404, detail="GitHub repository not found")
-            elif response.status_code == 401:
-                raise HTTPException(status_code=401, detail="GitHub authentication failed. Please check your GitHub token.")
-            elif not response.is_success:
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=f"Failed to fetch GitHub releases: {response.text}"
-                )
-            
-            releases_data = response.json()
-            
-            # Convert to response model
-            versions = []
-            for release in releases_data:
-                versions.append(GitHubReleaseVersion(
-                    tag_name=release.get("tag_name", ""),
-                    name=release.get("name", release.get("tag_name", "")),
-                    published_at=release.get("published_at", ""),
-                    html_url=release.get("html_url", ""),
-                    assets=release.get("assets", [])
-                ))
-            
-            return versions
-            
-        except httpx.TimeoutException:
-            raise HTTPException(status_code=504, detail="GitHub API request timeout")
-        except httpx.RequestError as e:
-            raise HTTPException(status_code=503, detail=f"Failed to connect to GitHub API: {str(e)}")
-
+    # Versions are already validated dicts; returning a response directly skips re-validation
+    return ORJSONResponse(versions)
@@ -4,10 +4,11 @@ Settings Management Routes
 
 from fastapi import APIRouter, HTTPException, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, delete
+from sqlalchemy import delete
 from datetime import datetime
 
-from database import get_db
+import github_token
+from database import get_db, dialect_insert
 from db_models import SettingsDB
 
 router = APIRouter(prefix="/api/settings", tags=["settings"])
@@ -16,15 +17,8 @@ router = APIRouter(prefix="/api/settings", tags=["settings"])
 @router.get("/github-token")
 async def get_github_token(db: AsyncSession = Depends(get_db)):
     """Get GitHub token (returns masked token if exists)"""
-    result = await db.execute(select(SettingsDB).where(SettingsDB.key == "github_token"))
-    settings_db = result.scalar_one_or_none()
-    
-    if settings_db and settings_db.value:
-        # Return masked token for security (show only last 4 characters)
-        token = settings_db.value
-        masked_token = "***" + token[-4:] if len(token) > 4 else "***"
-        return {"has_token": True, "token_preview": masked_token}
-    return {"has_token": False}
+    # Masked preview is computed when the token is saved, not on every read
+    return await github_token.status(db)
 
 
 @router.post("/github-token")
@@ -35,33 +29,24 @@ async def set_github_token(token_data: dict, db: AsyncSession = Depends(get_db))
     
     token_value = token_data["token"]
     
-    # Check if token exists
-    result = await db.execute(select(SettingsDB).where(SettingsDB.key == "github_token"))
-    settings_db = result.scalar_one_or_none()
-    
-    if settings_db:
-        # Update existing token
-        settings_db.value = token_value
-        settings_db.updated_at = datetime.now()
-    else:
-        # Create new token entry
-        settings_db = SettingsDB(key="github_token", value=token_value)
-        db.add(settings_db)
-    
+    # Insert or update in one statement (no SELECT to check for an existing row)
+    stmt = dialect_insert(SettingsDB).values(key=github_token.SETTINGS_KEY, value=token_value)
+    await db.execute(stmt.on_conflict_do_update(
+        index_elements=[SettingsDB.key],
+        set_={"value": stmt.excluded.value, "updated_at": datetime.now()},
+    ))
     await db.commit()
+    github_token.store(token_value)
     return {"message": "GitHub token saved successfully"}
 
 
 @router.delete("/github-token")
 async def delete_github_token(db: AsyncSession = Depends(get_db)):
     """Remove GitHub token"""
-    result = await db.execute(select(SettingsDB).where(SettingsDB.key == "github_token"))
-    settings_db = result.scalar_one_or_none()
-    
-    if settings_db:
-        # Use delete statement for SQLAlchemy 2.0 async
-        await db.execute(delete(SettingsDB).where(SettingsDB.key == "github_token"))
-        await db.commit()
+    # A DELETE matching no row is a no-op, so no SELECT is needed first
+    await db.execute(delete(SettingsDB).where(SettingsDB.key == github_token.SETTINGS_KEY))
+    await db.commit()
+    github_token.store(None)
     
     return {"message": "GitHub token removed successfully"}
 
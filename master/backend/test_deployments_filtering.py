@@ -5,55 +5,105 @@ Tests various filter combinations: agent_id, status, and combinations
 
 import pytest
 import pytest_asyncio
-from httpx import AsyncClient
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.pool import StaticPool
 
 from main import app
 from database import Base, get_db
+from routers import deployments
 from db_models import AgentDB, DeploymentDB, ReleaseDB, DeploymentStatusEnum, AgentStatusEnum
-from datetime import datetime
+from datetime import datetime, timedelta
 
 
 # Create in-memory SQLite database for testing
+# Same async driver as the application: routes get a real AsyncSession, and a sync
+# engine behind run_in_executor would still pay one thread hop per statement
 TEST_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
 
 test_engine = create_async_engine(
     TEST_DATABASE_URL,
     connect_args={"check_same_thread": False},
     poolclass=StaticPool,
+    query_cache_size=1200,  # Same compiled SQL cache size as the application engine
 )
 
-TestSessionLocal = async_sessionmaker(
-    test_engine,
-    class_=AsyncSession,
-    expire_on_commit=False,
-)
 
+# Let SQLAlchemy emit BEGIN itself: the sqlite3 driver's implicit transactions
+# break SAVEPOINT, which the per-test rollback below relies on
+@event.listens_for(test_engine.sync_engine, "connect")
+def _disable_driver_transactions(dbapi_connection, connection_record):
+    dbapi_connection.isolation_level = None
 
-async def override_get_db():
-    """Override database dependency for testing"""
-    async with TestSessionLocal() as session:
-        try:
-            yield session
-        finally:
-            await session.close()
 
+@event.listens_for(test_engine.sync_engine, "begin")
+def _emit_begin(conn):
+    conn.exec_driver_sql("BEGIN")
 
-@pytest_asyncio.fixture(scope="function")
+
+# Deployment IDs each filter returns for the test_data fixture, keyed by
+# (agent_id, status) with None for an unfiltered field; built once at import
+EXPECTED_IDS = {
+    (None, None): frozenset({"deploy-1", "deploy-2", "deploy-3", "deploy-4", "deploy-5", "deploy-6"}),
+    ("agent-1", None): frozenset({"deploy-1", "deploy-2", "deploy-3"}),
+    ("agent-2", None): frozenset({"deploy-4", "deploy-5", "deploy-6"}),
+    (None, "success"): frozenset({"deploy-1", "deploy-4", "deploy-6"}),
+    (None, "failed"): frozenset({"deploy-2"}),
+    (None, "pending"): frozenset({"deploy-3"}),
+    (None, "in_progress"): frozenset({"deploy-5"}),
+    ("agent-1", "success"): frozenset({"deploy-1"}),
+    ("agent-1", "failed"): frozenset({"deploy-2"}),
+    ("agent-1", "pending"): frozenset({"deploy-3"}),
+    ("agent-2", "success"): frozenset({"deploy-4", "deploy-6"}),
+    ("agent-2", "in_progress"): frozenset({"deploy-5"}),
+}
+
+
+@pytest_asyncio.fixture(scope="session")
 async def setup_database():
-    """Setup test database with tables"""
+    """Create the tables once for the whole session and warm the statement cache"""
     async with test_engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+    await deployments.warm_query_cache(async_sessionmaker(test_engine, class_=AsyncSession))
     yield
     async with test_engine.begin() as conn:
         await conn.run_sync(Base.metadata.drop_all)
+    await test_engine.dispose()
+
+
+@pytest_asyncio.fixture(scope="function")
+async def db_connection(setup_database):
+    """
+    Connection holding an outer transaction that is rolled back after the test
+    Sessions bound to it turn commit() into a SAVEPOINT release, so each test
+    starts from empty tables without re-running the DDL
+    """
+    async with test_engine.connect() as conn:
+        transaction = await conn.begin()
+        yield conn
+        await transaction.rollback()
 
 
 @pytest_asyncio.fixture(scope="function")
-async def test_data(setup_database):
+async def test_session_factory(db_connection):
+    """Session factory bound to the test's connection"""
+    return async_sessionmaker(
+        bind=db_connection,
+        class_=AsyncSession,
+        expire_on_commit=False,
+        join_transaction_mode="create_savepoint",
+    )
+
+
+@pytest_asyncio.fixture(scope="function")
+async def test_data(test_session_factory):
     """Create test data: agents, releases, and deployments"""
-    async with TestSessionLocal() as session:
+    # One clock read; deployments are spaced a second apart (deploy-6 newest),
+    # so created_at ordering is deterministic
+    now = datetime.now()
+    
+    async with test_session_factory() as session:
         # Create test agents
         agent1 = AgentDB(
             id="agent-1",
@@ -61,7 +111,7 @@ async def test_data(setup_database):
             platform="windows",
             version="1.0.0",
             status=AgentStatusEnum.ONLINE,
-            last_seen=datetime.now(),
+            last_seen=now,
             ip_address="192.168.1.1"
         )
         agent2 = AgentDB(
@@ -70,19 +120,16 @@ async def test_data(setup_database):
             platform="macos",
             version="1.0.0",
             status=AgentStatusEnum.ONLINE,
-            last_seen=datetime.now(),
+            last_seen=now,
             ip_address="192.168.1.2"
         )
-        session.add(agent1)
-        session.add(agent2)
-        
         # Create test releases
         release1 = ReleaseDB(
             id="release-1",
             tag_name="v1.0.0",
             name="Release 1.0.0",
             version="1.0.0",
-            release_date=datetime.now(),
+            release_date=now,
             download_url="https://github.com/test/repo/releases/"
         )
         release2 = ReleaseDB(
@@ -90,77 +137,68 @@ async def test_data(setup_database):
             tag_name="v1.1.0",
             name="Release 1.1.0",
             version="1.1.0",
-            release_date=datetime.now(),
+            release_date=now,
             download_url="https://github.com/test/repo/releases/"
         )
-        session.add(release1)
-        session.add(release2)
-        
         # Create test deployments with various statuses
         # Agent 1 deployments
         deployment1 = DeploymentDB(
             id="deploy-1",
             agent_id="agent-1",
-            agent_name="TestAgent1",
             release_ids=["release-1"],
             release_tags=["v1.0.0"],
             status=DeploymentStatusEnum.SUCCESS,
-            created_at=datetime.now()
+            created_at=now - timedelta(seconds=5)
         )
         deployment2 = DeploymentDB(
             id="deploy-2",
             agent_id="agent-1",
-            agent_name="TestAgent1",
             release_ids=["release-2"],
             release_tags=["v1.1.0"],
             status=DeploymentStatusEnum.FAILED,
-            created_at=datetime.now()
+            created_at=now - timedelta(seconds=4)
         )
         deployment3 = DeploymentDB(
             id="deploy-3",
             agent_id="agent-1",
-            agent_name="TestAgent1",
             release_ids=["release-1"],
             release_tags=["v1.0.0"],
             status=DeploymentStatusEnum.PENDING,
-            created_at=datetime.now()
+            created_at=now - timedelta(seconds=3)
         )
         
         # Agent 2 deployments
         deployment4 = DeploymentDB(
             id="deploy-4",
             agent_id="agent-2",
-            agent_name="TestAgent2",
             release_ids=["release-1"],
             release_tags=["v1.0.0"],
             status=DeploymentStatusEnum.SUCCESS,
-            created_at=datetime.now()
+            created_at=now - timedelta(seconds=2)
         )
         deployment5 = DeploymentDB(
             id="deploy-5",
             agent_id="agent-2",
-            agent_name="TestAgent2",
             release_ids=["release-2"],
             release_tags=["v1.1.0"],
             status=DeploymentStatusEnum.IN_PROGRESS,
-            created_at=datetime.now()
+            created_at=now - timedelta(seconds=1)
         )
         deployment6 = DeploymentDB(
             id="deploy-6",
             agent_id="agent-2",
-            agent_name="TestAgent2",
             release_ids=["release-1"],
             release_tags=["v1.0.0"],
             status=DeploymentStatusEnum.SUCCESS,
-            created_at=datetime.now()
+            created_at=now
         )
         
-        session.add(deployment1)
-        session.add(deployment2)
-        session.add(deployment3)
-        session.add(deployment4)
-        session.add(deployment5)
-        session.add(deployment6)
+        # Registered in one call; the flush batches each table into a multi-row INSERT
+        session.add_all([
+            agent1, agent2,
+            release1, release2,
+            deployment1, deployment2, deployment3, deployment4, deployment5, deployment6,
+        ])
         
         await session.commit()
         
@@ -174,12 +212,23 @@ async def test_data(setup_database):
         }
 
 
+@pytest_asyncio.fixture(scope="session")
+async def http_client():
+    """One ASGI-transport client for the whole session (no per-test transport setup)"""
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        yield ac
+
+
 @pytest_asyncio.fixture(scope="function")
-async def client(setup_database, test_data):
-    """Create test client with overridden database dependency"""
+async def client(http_client, test_session_factory, test_data):
+    """Shared test client with the database dependency bound to this test's connection"""
+    async def override_get_db():
+        """Override database dependency for testing"""
+        async with test_session_factory() as session:
+            yield session
+
     app.dependency_overrides[get_db] = override_get_db
-    async with AsyncClient(app=app, base_url="http://test") as ac:
-        yield ac
+    yield http_client
     app.dependency_overrides.clear()
 
 
@@ -191,17 +240,12 @@ class TestDeploymentFiltering:
         """Test getting all deployments without any filter"""
         response = await client.get("/api/deployments")
         assert response.status_code == 200
-        deployments = response.json()
+        deployments = response.json()["items"]
         
         # Should return all 6 deployments
         assert len(deployments) == 6
-        deployment_ids = [d["id"] for d in deployments]
-        assert "deploy-1" in deployment_ids
-        assert "deploy-2" in deployment_ids
-        assert "deploy-3" in deployment_ids
-        assert "deploy-4" in deployment_ids
-        assert "deploy-5" in deployment_ids
-        assert "deploy-6" in deployment_ids
+        assert response.json()["total"] == 6
+        assert {d["id"] for d in response.json()["items"]} == EXPECTED_IDS[(None, None)]
     
     @pytest.mark.asyncio
     async def test_filter_by_agent_id_only(self, client, test_data):
@@ -209,169 +253,120 @@ class TestDeploymentFiltering:
         # Filter by agent-1
         response = await client.get("/api/deployments?agent_id=agent-1")
         assert response.status_code == 200
-        deployments = response.json()
+        deployments = response.json()["items"]
         
         # Should return 3 deployments for agent-1
         assert len(deployments) == 3
+        assert response.json()["total"] == 3
         for deployment in deployments:
             assert deployment["agent_id"] == "agent-1"
             assert deployment["agent_name"] == "TestAgent1"
         
-        deployment_ids = [d["id"] for d in deployments]
-        assert "deploy-1" in deployment_ids
-        assert "deploy-2" in deployment_ids
-        assert "deploy-3" in deployment_ids
-        assert "deploy-4" not in deployment_ids
-        assert "deploy-5" not in deployment_ids
-        assert "deploy-6" not in deployment_ids
+        assert {d["id"] for d in response.json()["items"]} == EXPECTED_IDS[("agent-1", None)]
         
         # Filter by agent-2
         response = await client.get("/api/deployments?agent_id=agent-2")
         assert response.status_code == 200
-        deployments = response.json()
+        deployments = response.json()["items"]
         
         # Should return 3 deployments for agent-2
         assert len(deployments) == 3
+        assert response.json()["total"] == 3
         for deployment in deployments:
             assert deployment["agent_id"] == "agent-2"
             assert deployment["agent_name"] == "TestAgent2"
         
-        deployment_ids = [d["id"] for d in deployments]
-        assert "deploy-4" in deployment_ids
-        assert "deploy-5" in deployment_ids
-        assert "deploy-6" in deployment_ids
-        assert "deploy-1" not in deployment_ids
-        assert "deploy-2" not in deployment_ids
-        assert "deploy-3" not in deployment_ids
+        assert {d["id"] for d in response.json()["items"]} == EXPECTED_IDS[("agent-2", None)]
     
     @pytest.mark.asyncio
-    async def test_filter_by_status_only(self, client, test_data):
+    @pytest.mark.parametrize("status", ["success", "failed", "pending", "in_progress"])
+    async def test_filter_by_status_only(self, client, test_data, status):
         """Test filtering deployments by status only"""
-        # Filter by success status
-        response = await client.get("/api/deployments?status=success")
+        expected_ids = EXPECTED_IDS[(None, status)]
+        response = await client.get(f"/api/deployments?status={status}")
         assert response.status_code == 200
-        deployments = response.json()
+        deployments = response.json()["items"]
         
-        # Should return 3 success deployments (deploy-1, deploy-4, deploy-6)
-        assert len(deployments) == 3
+        assert len(deployments) == len(expected_ids)
+        assert response.json()["total"] == len(expected_ids)
+        assert {d["id"] for d in response.json()["items"]} == expected_ids
         for deployment in deployments:
-            assert deployment["status"] == "success"
-        
-        deployment_ids = [d["id"] for d in deployments]
-        assert "deploy-1" in deployment_ids
-        assert "deploy-4" in deployment_ids
-        assert "deploy-6" in deployment_ids
-        
-        # Filter by failed status
-        response = await client.get("/api/deployments?status=failed")
-        assert response.status_code == 200
-        deployments = response.json()
-        
-        # Should return 1 failed deployment (deploy-2)
-        assert len(deployments) == 1
-        assert deployments[0]["status"] == "failed"
-        assert deployments[0]["id"] == "deploy-2"
-        
-        # Filter by pending status
-        response = await client.get("/api/deployments?status=pending")
-        assert response.status_code == 200
-        deployments = response.json()
-        
-        # Should return 1 pending deployment (deploy-3)
-        assert len(deployments) == 1
-        assert deployments[0]["status"] == "pending"
-        assert deployments[0]["id"] == "deploy-3"
-        
-        # Filter by in_progress status
-        response = await client.get("/api/deployments?status=in_progress")
+            assert deployment["status"] == status
+    
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("statuses", [
+        ["success", "failed"],
+        ["pending", "in_progress"],
+        ["failed", "failed"],
+    ])
+    async def test_filter_by_multiple_statuses(self, client, test_data, statuses):
+        """Test filtering deployments by several statuses at once (repeated status parameter)"""
+        expected_ids = frozenset().union(*(EXPECTED_IDS[(None, status)] for status in statuses))
+        query = "&".join(f"status={status}" for status in statuses)
+        response = await client.get(f"/api/deployments?{query}")
         assert response.status_code == 200
-        deployments = response.json()
+        deployments = response.json()["items"]
         
-        # Should return 1 in_progress deployment (deploy-5)
-        assert len(deployments) == 1
-        assert deployments[0]["status"] == "in_progress"
-        assert deployments[0]["id"] == "deploy-5"
+        assert len(deployments) == len(expected_ids)
+        assert response.json()["total"] == len(expected_ids)
+        assert {d["id"] for d in response.json()["items"]} == expected_ids
+        for deployment in deployments:
+            assert deployment["status"] in statuses
     
     @pytest.mark.asyncio
-    async def test_filter_by_agent_id_and_status_combination(self, client, test_data):
+    @pytest.mark.parametrize("agent_id,status", [
+        ("agent-1", "success"),
+        ("agent-1", "failed"),
+        ("agent-1", "pending"),
+        ("agent-2", "success"),
+        ("agent-2", "in_progress"),
+    ])
+    async def test_filter_by_agent_id_and_status_combination(self, client, test_data, agent_id, status):
         """Test filtering deployments by both agent_id and status"""
-        # Filter by agent-1 and success status
-        response = await client.get("/api/deployments?agent_id=agent-1&status=success")
-        assert response.status_code == 200
-        deployments = response.json()
-        
-        # Should return 1 deployment (deploy-1)
-        assert len(deployments) == 1
-        assert deployments[0]["id"] == "deploy-1"
-        assert deployments[0]["agent_id"] == "agent-1"
-        assert deployments[0]["status"] == "success"
-        
-        # Filter by agent-1 and failed status
-        response = await client.get("/api/deployments?agent_id=agent-1&status=failed")
-        assert response.status_code == 200
-        deployments = response.json()
-        
-        # Should return 1 deployment (deploy-2)
-        assert len(deployments) == 1
-        assert deployments[0]["id"] == "deploy-2"
-        assert deployments[0]["agent_id"] == "agent-1"
-        assert deployments[0]["status"] == "failed"
-        
-        # Filter by agent-1 and pending status
-        response = await client.get("/api/deployments?agent_id=agent-1&status=pending")
-        assert response.status_code == 200
-        deployments = response.json()
-        
-        # Should return 1 deployment (deploy-3)
-        assert len(deployments) == 1
-        assert deployments[0]["id"] == "deploy-3"
-        assert deployments[0]["agent_id"] == "agent-1"
-        assert deployments[0]["status"] == "pending"
-        
-        # Filter by agent-2 and success status
-        response = await client.get("/api/deployments?agent_id=agent-2&status=success")
+        expected_ids = EXPECTED_IDS[(agent_id, status)]
+        response = await client.get(f"/api/deployments?agent_id={agent_id}&status={status}")
         assert response.status_code == 200
-        deployments = response.json()
+        deployments = response.json()["items"]
         
-        # Should return 2 deployments (deploy-4, deploy-6)
-        assert len(deployments) == 2
-        deployment_ids = [d["id"] for d in deployments]
-        assert "deploy-4" in deployment_ids
-        assert "deploy-6" in deployment_ids
+        assert len(deployments) == len(expected_ids)
+        assert response.json()["total"] == len(expected_ids)
+        assert {d["id"] for d in response.json()["items"]} == expected_ids
         for deployment in deployments:
-            assert deployment["agent_id"] == "agent-2"
-            assert deployment["status"] == "success"
-        
-        # Filter by agent-2 and in_progress status
-        response = await client.get("/api/deployments?agent_id=agent-2&status=in_progress")
-        assert response.status_code == 200
-        deployments = response.json()
-        
-        # Should return 1 deployment (deploy-5)
-        assert len(deployments) == 1
-        assert deployments[0]["id"] == "deploy-5"
-        assert deployments[0]["agent_id"] == "agent-2"
-        assert deployments[0]["status"] == "in_progress"
+            assert deployment["agent_id"] == agent_id
+            assert deployment["status"] == status
     
     @pytest.mark.asyncio
     async def test_filter_by_nonexistent_agent_id(self, client, test_data):
         """Test filtering by non-existent agent_id returns empty list"""
         response = await client.get("/api/deployments?agent_id=nonexistent-agent")
         assert response.status_code == 200
-        deployments = response.json()
+        deployments = response.json()["items"]
         
         # Should return empty list
         assert len(deployments) == 0
         assert deployments == []
+        assert response.json()["total"] == 0
     
     @pytest.mark.asyncio
     async def test_filter_by_nonexistent_status(self, client, test_data):
-        """Test filtering by non-existent status returns empty list"""
-        # Note: FastAPI will validate the enum, so invalid status will return 422
-        # But if we use a valid enum value that doesn't exist in data, it should return empty
-        response = await client.get("/api/deployments?status=success")
+        """Test filtering by statuses that are invalid or have no matching deployments"""
+        # FastAPI validates every repeated value against the enum: one invalid value is a 422
+        response = await client.get("/api/deployments?status=success&status=unknown")
+        assert response.status_code == 422
+        
+        # Valid statuses with no deployments for the agent return an empty page
+        # (agent-2 has only success and in_progress deployments)
+        response = await client.get("/api/deployments?agent_id=agent-2&status=failed&status=pending")
+        assert response.status_code == 200
+        assert response.json()["items"] == []
+        assert response.json()["total"] == 0
+        
+        # Only the requested statuses come back when some of them have no matches
+        response = await client.get("/api/deployments?agent_id=agent-2&status=failed&status=in_progress")
         assert response.status_code == 200
-        # This test verifies that valid status values work correctly
+        deployments = response.json()["items"]
+        assert [(d["id"], d["status"]) for d in deployments] == [("deploy-5", "in_progress")]
+        assert response.json()["total"] == 1
     
     @pytest.mark.asyncio
     async def test_filter_agent_id_with_no_matching_status(self, client, test_data):
@@ -379,39 +374,92 @@ class TestDeploymentFiltering:
         # Agent-1 has no in_progress deployments
         response = await client.get("/api/deployments?agent_id=agent-1&status=in_progress")
         assert response.status_code == 200
-        deployments = response.json()
+        deployments = response.json()["items"]
         
         # Should return empty list
         assert len(deployments) == 0
+        assert response.json()["total"] == 0
         
         # Agent-2 has no failed deployments
         response = await client.get("/api/deployments?agent_id=agent-2&status=failed")
         assert response.status_code == 200
-        deployments = response.json()
+        deployments = response.json()["items"]
         
         # Should return empty list
         assert len(deployments) == 0
+        assert response.json()["total"] == 0
     
     @pytest.mark.asyncio
     async def test_deployments_ordered_by_created_at_desc(self, client, test_data):
         """Test that deployments are ordered by created_at descending (newest first)"""
         response = await client.get("/api/deployments")
         assert response.status_code == 200
-        deployments = response.json()
+        deployments = response.json()["items"]
+        assert len(deployments) == 6
+        
+        # The timestamps come back in canonical naive ISO-8601 form (same as isoformat()),
+        # which the string comparison below relies on
+        fixture_deployments = test_data["deployments"]["agent1"] + test_data["deployments"]["agent2"]
+        expected_created_at = sorted((d.created_at.isoformat() for d in fixture_deployments), reverse=True)
+        assert [d["created_at"] for d in deployments] == expected_created_at
         
         # Check that deployments are ordered by created_at descending
-        if len(deployments) > 1:
-            for i in range(len(deployments) - 1):
-                current_time = datetime.fromisoformat(deployments[i]["created_at"].replace("Z", "+00:00"))
-                next_time = datetime.fromisoformat(deployments[i + 1]["created_at"].replace("Z", "+00:00"))
-                assert current_time >= next_time, "Deployments should be ordered by created_at descending"
+        # (compared as returned: naive ISO-8601 strings order like the datetimes they encode)
+        for current, following in zip(deployments, deployments[1:]):
+            assert current["created_at"] > following["created_at"], "Deployments should be ordered by created_at descending"
+        
+        # Fixture timestamps are a second apart, so the order is fully determined
+        assert [d["id"] for d in deployments] == [f"deploy-{n}" for n in range(6, 0, -1)]
+    
+    @pytest.mark.asyncio
+    async def test_keyset_pagination_boundaries(self, client, test_data):
+        """Test paging with the (created_at, id) cursor: no row skipped or repeated"""
+        response = await client.get("/api/deployments?limit=6")
+        assert response.status_code == 200
+        all_ids = [d["id"] for d in response.json()["items"]]
+        assert len(all_ids) == 6
+        
+        seen_ids = []
+        cursor = ""
+        while True:
+            response = await client.get(f"/api/deployments?limit=4{cursor}")
+            assert response.status_code == 200
+            page = response.json()
+            assert page["total"] == 6
+            assert len(page["items"]) <= 4
+            if not page["items"]:
+                break
+            seen_ids.extend(d["id"] for d in page["items"])
+            last = page["items"][-1]
+            cursor = f"&before_created_at={last['created_at']}&before_id={last['id']}"
+        
+        # Pages of 4 then 2, in the same order as a single page
+        assert seen_ids == all_ids
+        
+        # The cursor combines with filters
+        response = await client.get("/api/deployments?agent_id=agent-1&limit=2")
+        first_page = response.json()["items"]
+        assert len(first_page) == 2
+        last = first_page[-1]
+        response = await client.get(
+            f"/api/deployments?agent_id=agent-1&limit=2&before_created_at={last['created_at']}&before_id={last['id']}"
+        )
+        second_page = response.json()["items"]
+        assert len(second_page) == 1
+        assert {d["id"] for d in first_page + second_page} == EXPECTED_IDS[("agent-1", None)]
+    
+    @pytest.mark.asyncio
+    async def test_keyset_cursor_requires_both_fields(self, client, test_data):
+        """Test that a half-given cursor is rejected"""
+        response = await client.get("/api/deployments?before_id=deploy-3")
+        assert response.status_code == 400
     
     @pytest.mark.asyncio
     async def test_filter_preserves_deployment_structure(self, client, test_data):
         """Test that filtered results maintain correct deployment structure"""
         response = await client.get("/api/deployments?agent_id=agent-1&status=success")
         assert response.status_code == 200
-        deployments = response.json()
+        deployments = response.json()["items"]
         
         assert len(deployments) == 1
         deployment = deployments[0]
@@ -0,0 +1,129 @@
+"""
+Unit tests for the agent heartbeat write-behind queue
+Tests batching of queued heartbeats, last_seen served from memory, and the shutdown drain
+"""
+
+import asyncio
+from datetime import datetime
+
+import pytest
+import pytest_asyncio
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import event, select
+
+import heartbeat
+import known_agents
+from main import app
+from db_models import AgentDB
+
+
+AGENT = {"name": "agent-hb", "platform": "windows", "version": "1.0.0", "ip_address": "10.0.0.1"}
+
+
+@pytest_asyncio.fixture(scope="function")
+async def client(app_session_factory, monkeypatch):
+    """Test client with a running heartbeat flusher writing to the test database"""
+    monkeypatch.setattr(heartbeat, "AsyncSessionLocal", app_session_factory)
+    monkeypatch.setattr(heartbeat, "_agent_ids_by_name", {})
+    monkeypatch.setattr(heartbeat, "_latest", {})
+    monkeypatch.setattr(heartbeat, "_written", {})
+    monkeypatch.setattr(known_agents, "_agent_ids", set())
+    # Wide enough that every heartbeat a test sends lands in the first batch
+    monkeypatch.setattr(heartbeat, "FLUSH_INTERVAL_SECONDS", 0.2)
+
+    heartbeat.start()
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        yield ac
+    await heartbeat.stop()
+
+
+@pytest.fixture(scope="function")
+def agent_updates(app_engine):
+    """Parameter-set count of every UPDATE on agents, one entry per statement executed"""
+    updates = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("UPDATE AGENTS"):
+            updates.append(len(parameters) if executemany else 1)
+
+    event.listen(app_engine.sync_engine, "before_cursor_execute", record)
+    yield updates
+    event.remove(app_engine.sync_engine, "before_cursor_execute", record)
+
+
+async def _register(client, **changes) -> dict:
+    """Send a register/heartbeat request and return the agent it describes"""
+    response = await client.post("/api/agents/register", json={**AGENT, **changes})
+    assert response.status_code in (200, 202)
+    return response.json()
+
+
+async def _flushed():
+    """Wait until the flusher has had time to collect and write a batch"""
+    await asyncio.sleep(heartbeat.FLUSH_INTERVAL_SECONDS * 3)
+
+
+async def _stored_agent(app_session_factory, agent_id: str) -> AgentDB:
+    async with app_session_factory() as session:
+        return await session.scalar(select(AgentDB).where(AgentDB.id == agent_id))
+
+
+class TestHeartbeatQueue:
+    """Test suite for the heartbeat write-behind queue"""
+
+    @pytest.mark.asyncio
+    async def test_heartbeats_in_one_batch_are_written_with_one_update(
+        self, client, app_session_factory, agent_updates
+    ):
+        """Test that queued heartbeats are coalesced into one UPDATE with the latest values"""
+        agent = await _register(client)  # First registration: synchronous INSERT
+
+        # Each IP change needs a write; all three are queued within one flush interval
+        for ip_address in ("10.0.0.2", "10.0.0.3", "10.0.0.4"):
+            response = await client.post("/api/agents/register", json={**AGENT, "ip_address": ip_address})
+            assert response.status_code == 202
+        await _flushed()
+
+        # One statement with one parameter set: only the agent's latest heartbeat is written
+        assert agent_updates == [1]
+        stored = await _stored_agent(app_session_factory, agent["id"])
+        assert stored.ip_address == "10.0.0.4"
+
+    @pytest.mark.asyncio
+    async def test_unchanged_heartbeat_is_served_from_memory(
+        self, client, app_session_factory, agent_updates
+    ):
+        """Test that a skipped heartbeat still shows up as the agent's last_seen"""
+        agent = await _register(client)
+        registered_at = datetime.fromisoformat(agent["last_seen"])
+
+        beat = await _register(client)
+        beat_at = datetime.fromisoformat(beat["last_seen"])
+        assert beat_at > registered_at
+        await _flushed()
+
+        # Nothing changed and the stored last_seen is fresh: no write
+        assert agent_updates == []
+        stored = await _stored_agent(app_session_factory, agent["id"])
+        assert stored.last_seen == registered_at
+
+        response = await client.get(f"/api/agents/{agent['id']}")
+        assert response.status_code == 200
+        assert datetime.fromisoformat(response.json()["last_seen"]) == beat_at
+        assert response.json()["status"] == "online"
+
+    @pytest.mark.asyncio
+    async def test_stop_writes_skipped_heartbeats(self, client, app_session_factory, agent_updates):
+        """Test that shutdown writes the latest last_seen of agents whose heartbeats were skipped"""
+        agent = await _register(client)
+        beat = await _register(client)
+        await _flushed()
+        assert agent_updates == []
+
+        await heartbeat.stop()
+
+        assert agent_updates == [1]
+        stored = await _stored_agent(app_session_factory, agent["id"])
+        assert stored.last_seen == datetime.fromisoformat(beat["last_seen"])
+        # Heartbeats after the flusher stopped take the synchronous path
+        assert heartbeat.lookup_agent_id(AGENT["name"]) is None
@@ -0,0 +1,29 @@
+"""
+Unit tests for the metrics endpoints
+Tests that POST /api/metrics/reset clears the collected metrics and cached summaries
+"""
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from main import app
+
+
+@pytest.mark.asyncio
+async def test_reset_metrics_clears_collected_requests():
+    """Test that a reset drops every earlier request from the metrics summary"""
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        for _ in range(3):
+            assert (await client.get("/api/metrics/pending-deployments")).status_code == 200
+        # Fills the summary cache, so the reset also has to invalidate it
+        before = (await client.get("/api/metrics")).json()
+        assert before["total_requests"] >= 3
+
+        response = await client.post("/api/metrics/reset")
+        assert response.status_code == 200
+        assert response.json() == {"message": "Metrics reset"}
+
+        # Only the reset request itself was recorded after the counters were cleared
+        after = (await client.get("/api/metrics")).json()
+        assert after["total_requests"] == 1
+        assert list(after["endpoints"]) == ["POST /api/metrics/reset"]
@@ -0,0 +1,159 @@
+"""
+Unit tests for pending deployment polling
+Tests the in-process pending set, claiming with UPDATE ... RETURNING, and bulk creation
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+import pytest_asyncio
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import event, insert, select
+
+import known_agents
+import pending_deployments
+from main import app
+from db_models import AgentDB, DeploymentDB, ReleaseDB, AgentStatusEnum, DeploymentStatusEnum
+
+
+AGENT_ID = "agent-poll"
+PENDING_URL = f"/api/deployments/pending/{AGENT_ID}"
+
+
+@pytest_asyncio.fixture(scope="function")
+async def client(app_session_factory, monkeypatch):
+    """Test client for a database holding one agent and one release, with empty in-process sets"""
+    monkeypatch.setattr(known_agents, "_agent_ids", set())
+    monkeypatch.setattr(pending_deployments, "_agent_ids", set())
+
+    async with app_session_factory() as session:
+        session.add_all([
+            AgentDB(
+                id=AGENT_ID,
+                name="Poll Agent",
+                platform="windows",
+                version="1.0.0",
+                status=AgentStatusEnum.ONLINE,
+                last_seen=datetime.now(),
+            ),
+            ReleaseDB(id="release-1", tag_name="v1.0.0", name="Release 1", release_date=datetime.now()),
+        ])
+        await session.commit()
+    known_agents.add(AGENT_ID)
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        yield ac
+
+
+@pytest.fixture(scope="function")
+def statements(app_engine):
+    """SQL of every statement executed on the test database"""
+    executed = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    event.listen(app_engine.sync_engine, "before_cursor_execute", record)
+    yield executed
+    event.remove(app_engine.sync_engine, "before_cursor_execute", record)
+
+
+def _pending_row(deployment_id: str, created_at: datetime) -> dict:
+    return {
+        "id": deployment_id,
+        "agent_id": AGENT_ID,
+        "release_ids": ["release-1"],
+        "release_tags": ["v1.0.0"],
+        "status": DeploymentStatusEnum.PENDING,
+        "created_at": created_at,
+    }
+
+
+async def _poll(client):
+    """Poll for the agent's next deployment and return the response body"""
+    response = await client.get(PENDING_URL)
+    assert response.status_code == 200
+    return response.json()
+
+
+class TestPendingDeploymentPolling:
+    """Test suite for the agent polling endpoint"""
+
+    @pytest.mark.asyncio
+    async def test_poll_without_pending_work_runs_no_query(self, client, statements):
+        """Test that an agent with nothing pending is answered without touching the database"""
+        assert await _poll(client) is None
+        assert statements == []
+
+    @pytest.mark.asyncio
+    async def test_pending_deployments_are_claimed_oldest_first(self, client, app_session_factory):
+        """Test that each poll claims the oldest PENDING deployment, then returns null"""
+        now = datetime.now()
+        async with app_session_factory() as session:
+            # Inserted newest first, so only the created_at ordering yields the oldest
+            await session.execute(insert(DeploymentDB), [
+                _pending_row("deploy-newer", now),
+                _pending_row("deploy-older", now - timedelta(minutes=5)),
+            ])
+            await session.commit()
+        pending_deployments.add(AGENT_ID)
+
+        first = await _poll(client)
+        assert first["id"] == "deploy-older"
+        assert first["status"] == "in_progress"
+        assert first["agent_name"] == "Poll Agent"
+        assert first["started_at"] is not None
+
+        assert (await _poll(client))["id"] == "deploy-newer"
+        assert await _poll(client) is None
+        # The empty claim cleared the flag: the next poll skips the database again
+        assert not pending_deployments.has_pending(AGENT_ID)
+
+        async with app_session_factory() as session:
+            result = await session.execute(select(DeploymentDB.id, DeploymentDB.status))
+            assert dict(result.all()) == {
+                "deploy-older": DeploymentStatusEnum.IN_PROGRESS,
+                "deploy-newer": DeploymentStatusEnum.IN_PROGRESS,
+            }
+
+    @pytest.mark.asyncio
+    async def test_deployment_created_during_claim_is_not_lost(self, client, app_engine):
+        """Test that work queued while a claim runs is picked up by the next poll"""
+        pending_deployments.add(AGENT_ID)
+        created = []
+
+        def create_during_claim(conn, cursor, statement, parameters, context, executemany):
+            # After the claim found nothing: insert a deployment and flag the agent,
+            # as create_deployment does after its commit
+            if statement.lstrip().upper().startswith("UPDATE DEPLOYMENTS") and not created:
+                created.append(True)
+                conn.execute(insert(DeploymentDB), [_pending_row("deploy-during-claim", datetime.now())])
+                pending_deployments.add(AGENT_ID)
+
+        event.listen(app_engine.sync_engine, "after_cursor_execute", create_during_claim)
+        try:
+            assert await _poll(client) is None
+        finally:
+            event.remove(app_engine.sync_engine, "after_cursor_execute", create_during_claim)
+
+        assert pending_deployments.has_pending(AGENT_ID)
+        assert (await _poll(client))["id"] == "deploy-during-claim"
+
+    @pytest.mark.asyncio
+    async def test_bulk_create_gives_repeated_agent_distinct_ids(self, client):
+        """Test that a bulk request with the same agent twice creates two claimable deployments"""
+        response = await client.post("/api/deployments/bulk", json=[
+            {"agent_id": AGENT_ID, "release_ids": ["release-1"]},
+            {"agent_id": AGENT_ID, "release_ids": ["release-1"], "release_versions": ["v0.9.0"]},
+        ])
+        assert response.status_code == 200
+        created = response.json()
+        assert len(created) == 2
+        assert created[0]["id"] != created[1]["id"]
+        assert [d["release_tags"] for d in created] == [["v1.0.0"], ["v0.9.0"]]
+        assert all(d["status"] == "pending" for d in created)
+        assert pending_deployments.has_pending(AGENT_ID)
+
+        claimed = {(await _poll(client))["id"], (await _poll(client))["id"]}
+        assert claimed == {d["id"] for d in created}
+        assert await _poll(client) is None
@@ -227,7 +227,7 @@ function App() {
   async function loadDeployments() {
     try {
       const response = await axios.get(`${API_BASE}/deployments/history`)
-      setDeployments(response.data)
+      setDeployments(response.data.items)
     } catch (error) {
       console.error('Failed to load deployments:', error)
     }
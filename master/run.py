@@ -9,7 +9,13 @@ import sys
 import signal
 import os
 import shutil
+import hashlib
+import functools
+import threading
+import socket
+import time
 from pathlib import Path
+from typing import Optional
 
 # Get project root
 project_root = Path(__file__).parent
@@ -18,6 +24,14 @@ frontend_dir = project_root / "frontend"
 
 processes = []
 
+# Hash of the dependency manifest the last successful install ran against
+backend_deps_sentinel = backend_dir / ".deps-installed"
+frontend_deps_sentinel = frontend_dir / "node_modules" / ".hash"
+
+# Backend port (same PORT variable the backend's config reads) and how long to wait for it
+backend_port = int(os.getenv("PORT", "8000"))
+BACKEND_STARTUP_TIMEOUT_SECONDS = 30
+
 
 def cleanup():
     """Terminate all subprocesses"""
@@ -39,8 +53,9 @@ def signal_handler(sig, frame):
     sys.exit(0)
 
 
+@functools.lru_cache(maxsize=1)
 def find_npm():
-    """Find npm executable, handling Windows"""
+    """Find npm executable, handling Windows (PATH is searched once per run)"""
     npm = shutil.which("npm")
     if npm:
         return npm
@@ -51,19 +66,72 @@ def find_npm():
     return None
 
 
-def check_and_install_dependencies():
-    """Check and install dependencies if needed"""
-    # Check if npm is available
-    npm = find_npm()
-    if not npm:
-        print("❌ Error: npm is not installed or not in PATH")
-        print("   Please install Node.js from https://nodejs.org/")
-        print("   npm comes bundled with Node.js")
-        sys.exit(1)
-    
+def forward_output(process, prefix: bytes):
+    """
+    Copy a child's output to this terminal line by line with a name prefix
+    Runs in a daemon thread per child; only these threads write to the console
+    """
+    for line in iter(process.stdout.readline, b""):
+        sys.stdout.buffer.write(prefix + line)
+        sys.stdout.buffer.flush()
+
+
+def start_service(name: str, command, cwd: Path, **kwargs):
+    """Start a service with its stdout/stderr piped through forward_output"""
+    process = subprocess.Popen(
+        command,
+        cwd=cwd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        bufsize=0,
+        **kwargs
+    )
+    processes.append(process)
+    threading.Thread(target=forward_output, args=(process, f"[{name}] ".encode()), daemon=True).start()
+    return process
+
+
+def wait_for_backend(backend_process) -> Optional[bool]:
+    """
+    Wait until the backend accepts TCP connections (polled every 50 ms)
+    Returns True once reachable, False if the backend process exits first,
+    and None if it is still running but not reachable at the timeout
+    """
+    deadline = time.monotonic() + BACKEND_STARTUP_TIMEOUT_SECONDS
+    while time.monotonic() < deadline:
+        if backend_process.poll() is not None:
+            return False
+        try:
+            with socket.create_connection(("localhost", backend_port), timeout=0.1):
+                return True
+        except OSError:
+            time.sleep(0.05)
+    return None
+
+
+def dependencies_hash(manifest: Path) -> str:
+    """
+    Hash of a dependency manifest plus the interpreter running this script
+    (a different Python/virtualenv needs its own install even for the same file)
+    """
+    digest = hashlib.sha256(manifest.read_bytes())
+    digest.update(sys.executable.encode())
+    return digest.hexdigest()
+
+
+def dependencies_current(sentinel: Path, expected_hash: str) -> bool:
+    """Check if the last successful install was for this manifest hash"""
+    try:
+        return sentinel.read_text().strip() == expected_hash
+    except OSError:
+        return False
+
+
+def check_and_install_dependencies(npm: str):
+    """Check and install dependencies if needed (skipped while the manifests are unchanged)"""
     # Check frontend dependencies
-    node_modules = frontend_dir / "node_modules"
-    if not node_modules.exists():
+    frontend_hash = dependencies_hash(frontend_dir / "package-lock.json")
+    if not dependencies_current(frontend_deps_sentinel, frontend_hash):
         print("📦 Installing frontend dependencies...")
         # Use shell=True on Windows for better compatibility
         use_shell = os.name == 'nt'
@@ -73,12 +141,18 @@ def check_and_install_dependencies():
             check=True,
             shell=use_shell
         )
+        frontend_deps_sentinel.write_text(frontend_hash)
     
-    subprocess.run(
-        [sys.executable, "-m", "pip", "install", "-r", "requirements.txt"],
-        cwd=backend_dir,
-        check=True
-    )
+    # Check backend dependencies (pip's resolver takes seconds even when nothing changed)
+    backend_hash = dependencies_hash(backend_dir / "requirements.txt")
+    if not dependencies_current(backend_deps_sentinel, backend_hash):
+        print("📦 Installing backend dependencies...")
+        subprocess.run(
+            [sys.executable, "-m", "pip", "install", "-r", "requirements.txt"],
+            cwd=backend_dir,
+            check=True
+        )
+        backend_deps_sentinel.write_text(backend_hash)
 
 
 def main():
@@ -87,44 +161,46 @@ def main():
     signal.signal(signal.SIGTERM, signal_handler)
 
     print("🚀 Starting Master services...")
-    print("   Backend: http://localhost:8000")
+    print(f"   Backend: http://localhost:{backend_port}")
     print("   Frontend: http://localhost:3000")
     print("   (Press Ctrl+C to stop)\n")
 
+    # Check if npm is available (resolved once, used by the install and run stages)
+    npm = find_npm()
+    if not npm:
+        print("❌ Error: npm is not installed or not in PATH")
+        print("   Please install Node.js from https://nodejs.org/")
+        print("   npm comes bundled with Node.js")
+        sys.exit(1)
+
     # Check and install dependencies
-    check_and_install_dependencies()
+    check_and_install_dependencies(npm)
 
-    # Start backend
+    # Start backend and frontend together: Vite's startup does not need the backend,
+    # so it overlaps with FastAPI's (the dev proxy only reaches the backend per request)
     print("📦 Starting backend server...")
-    backend_process = subprocess.Popen(
+    backend_process = start_service(
+        "backend",
         [sys.executable, "main.py"],
-        cwd=backend_dir,
-        stdout=sys.stdout,
-        stderr=sys.stderr,
+        backend_dir,
+        # A piped Python child block-buffers its output; keep log lines live
+        env={**os.environ, "PYTHONUNBUFFERED": "1"},
     )
-    processes.append(backend_process)
-
-    # Wait a moment for backend to start
-    import time
-    time.sleep(2)
 
     # Start frontend (React + Vite)
     print("📦 Starting frontend dev server (React + Vite)...")
-    npm = find_npm()
-    if not npm:
-        print("❌ Error: npm is not installed or not in PATH")
-        print("   Please install Node.js from https://nodejs.org/")
-        sys.exit(1)
-    
     use_shell = os.name == 'nt'
-    frontend_process = subprocess.Popen(
-        [npm, "run", "dev"],
-        cwd=frontend_dir,
-        stdout=sys.stdout,
-        stderr=sys.stderr,
-        shell=use_shell
-    )
-    processes.append(frontend_process)
+    start_service("frontend", [npm, "run", "dev"], frontend_dir, shell=use_shell)
+
+    backend_ready = wait_for_backend(backend_process)
+    if backend_ready is False:
+        print(f"❌ Error: backend exited during startup (exit code {backend_process.returncode})")
+        cleanup()
+        sys.exit(1)
+    if backend_ready:
+        print(f"✅ Backend ready on port {backend_port}\n")
+    else:
+        print(f"⚠️  Backend not reachable on port {backend_port} after {BACKEND_STARTUP_TIMEOUT_SECONDS}s, still running\n")
 
     # Wait for all processes
     try:
@@ -8,6 +8,9 @@ import subprocess
 from pathlib import Path
 from typing import Optional
 
+# Semver x.y.z; the groups are the three numeric parts
+_SEMVER_RE = re.compile(r'(\d+)\.(\d+)\.(\d+)')
+
 
 class VersionManager:
     """Version management class"""
@@ -24,8 +27,7 @@ class VersionManager:
 
     def validate_version(self, version: str) -> bool:
         """Validate version format (semver: x.y.z)"""
-        pattern = r'^\d+\.\d+\.\d+$'
-        return bool(re.match(pattern, version))
+        return _SEMVER_RE.fullmatch(version) is not None
 
     def update_version(self, version: str):
         """Update version file"""
@@ -36,18 +38,23 @@ class VersionManager:
         self.version_file.write_text(version + "\n")
 
         # Commit changes to Git (optional)
+        # One git process: --only commits the file's working-tree content without a
+        # separate `git add` (and leaves anything else that is staged out of the commit)
+        commit = ["git", "commit", "-m", f"Bump version to {version}"]
         try:
-            subprocess.run(
-                ["git", "add", str(self.version_file)],
-                check=True,
-                capture_output=True
-            )
-            subprocess.run(
-                ["git", "commit", "-m", f"Bump version to {version}"],
-                check=True,
+            result = subprocess.run(
+                commit + ["--only", "--", str(self.version_file)],
                 capture_output=True
             )
-        except subprocess.CalledProcessError:
+            if result.returncode != 0:
+                # --only needs a tracked file: the first VERSION is added explicitly
+                subprocess.run(
+                    ["git", "add", str(self.version_file)],
+                    check=True,
+                    capture_output=True
+                )
+                subprocess.run(commit, check=True, capture_output=True)
+        except (subprocess.CalledProcessError, FileNotFoundError):
             # Continue even if Git is not available or commit fails
             pass
 
@@ -57,13 +64,12 @@ class VersionManager:
         print(f"🏷️  Creating Git tag: {tag_name}")
 
         try:
-            # Check if tag already exists
+            # Check if tag already exists (direct ref lookup, no listing of every tag)
             result = subprocess.run(
-                ["git", "tag", "-l", tag_name],
-                capture_output=True,
-                text=True
+                ["git", "rev-parse", "--verify", "--quiet", f"refs/tags/{tag_name}"],
+                capture_output=True
             )
-            if tag_name in result.stdout:
+            if result.returncode == 0:
                 print(f"⚠️  Tag {tag_name} already exists.")
                 return
 
@@ -87,7 +93,10 @@ class VersionManager:
         if not current:
             return "1.0.0"
 
-        major, minor, patch = map(int, current.split("."))
+        match = _SEMVER_RE.fullmatch(current)
+        if not match:
+            raise ValueError(f"Invalid version in {self.version_file.name}: {current}. Format: x.y.z")
+        major, minor, patch = map(int, match.groups())
 
         if part == "major":
             major += 1